@@ -11,7 +11,10 @@ from app.services.apikey import ApiKeyService
 from app.services.demo import DemoRequestService
 from app.services.file import FileService
 from app.services.operation import Operation
+from app.services.operation_job import OperationJobService
 from app.services.project import ProjectService
+from app.services.tile import TileService
+from app.services.upload_session import UploadSessionService
 from app.services.user import UserService
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token", scheme_name="JWT")
@@ -117,5 +120,17 @@ def get_operation_service_instance(db: Session = Depends(get_db)):
     return Operation(db)
 
 
+def get_operation_job_service_instance(db: Session = Depends(get_db)):
+    return OperationJobService(db)
+
+
+def get_tile_service_instance(db: Session = Depends(get_db)):
+    return TileService(db)
+
+
+def get_upload_session_service_instance(db: Session = Depends(get_db)):
+    return UploadSessionService(db)
+
+
 def get_demo_request_service_instance(db: Session = Depends(get_db)):
     return DemoRequestService(db=db)
@@ -1,3 +1,5 @@
+import tempfile
+
 from fastapi import (
     APIRouter,
     Depends,
@@ -5,15 +7,29 @@ from fastapi import (
     Form,
     HTTPException,
     Path,
+    Request,
     UploadFile,
     status,
 )
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
 
-from app import dto
-from app.api.api_v1.deps import get_file_service_instance, retrieve_project
+from app import dto, schemas
+from app.api.api_v1.deps import (
+    get_file_service_instance,
+    get_tile_service_instance,
+    get_upload_session_service_instance,
+    retrieve_project,
+)
 from app.config import settings
 from app.models import Project
-from app.services.file import FileService
+from app.services.file import FileService, max_file_size
+from app.services.tile import TileService
+from app.services.upload_session import (
+    MAX_PARTS,
+    UploadSessionService,
+    wrong_part_size,
+)
 
 router = APIRouter()
 
@@ -21,7 +37,7 @@ ALLOWED_FILE_EXTENSION = ["tiff", "tif"]
 
 
 @router.post("/upload", response_model=dto.File)
-async def upload_file(
+def upload_file(
     filename: str | None = Form(None),
     file: UploadFile = File(...),
     file_service: FileService = Depends(get_file_service_instance),
@@ -42,16 +58,135 @@ async def upload_file(
             detail="File should have an extension",
         )
 
-    if file.size > settings.max_size_file:
+    max_size = max_file_size(project.user)
+    if file.size > max_size:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Size of this file more than {settings.max_size_file}",
+            detail=f"Size of this file more than {max_size}",
         )
 
     file_model = file_service.create(file, filename, extension, project)
     return file_model
 
 
+@router.post(
+    "/uploads", response_model=dto.UploadSession, status_code=status.HTTP_201_CREATED
+)
+def create_upload_session(
+    upload: schemas.UploadSessionCreate,
+    upload_session_service: UploadSessionService = Depends(
+        get_upload_session_service_instance
+    ),
+    project: Project = Depends(retrieve_project),
+):
+    if upload.extension not in ALLOWED_FILE_EXTENSION:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid file extension"
+        )
+    return upload_session_service.create(
+        upload.filename, upload.extension, upload.size, project
+    )
+
+
+@router.get("/uploads/{id}", response_model=dto.UploadSession)
+def get_upload_session(
+    upload_session_id: int = Path(alias="id"),
+    upload_session_service: UploadSessionService = Depends(
+        get_upload_session_service_instance
+    ),
+    project: Project = Depends(retrieve_project),
+):
+    upload_session = upload_session_service.get(upload_session_id, project)
+    return dto.UploadSession.model_validate(upload_session).model_copy(
+        update={"parts": upload_session_service.list_parts(upload_session)}
+    )
+
+
+@router.put("/uploads/{id}/parts/{part_number}", response_model=dto.UploadPart)
+async def upload_part(
+    request: Request,
+    upload_session_id: int = Path(alias="id"),
+    part_number: int = Path(ge=1, le=MAX_PARTS),
+    upload_session_service: UploadSessionService = Depends(
+        get_upload_session_service_instance
+    ),
+    project: Project = Depends(retrieve_project),
+):
+    # Parts of the wrong size are rejected before their body is read, or as
+    # soon as it runs past the expected size when no length was sent
+    expected_size = await run_in_threadpool(
+        upload_session_service.get_part_size, upload_session_id, project, part_number
+    )
+    declared_size = request.headers.get("content-length")
+    if declared_size is not None and declared_size != str(expected_size):
+        raise wrong_part_size(part_number, expected_size)
+
+    # The raw request body is the part; it is spooled so a part only stays
+    # in memory while it is small
+    with tempfile.SpooledTemporaryFile(max_size=settings.upload_chunk_size) as body:
+        async for chunk in request.stream():
+            if body.tell() + len(chunk) > expected_size:
+                raise wrong_part_size(part_number, expected_size)
+            await run_in_threadpool(body.write, chunk)
+        content_length = body.tell()
+        body.seek(0)
+        return await run_in_threadpool(
+            upload_session_service.upload_part,
+            upload_session_id,
+            project,
+            part_number,
+            body,
+            content_length,
+        )
+
+
+@router.post("/uploads/{id}/complete", response_model=dto.File)
+def complete_upload_session(
+    upload_session_id: int = Path(alias="id"),
+    upload_session_service: UploadSessionService = Depends(
+        get_upload_session_service_instance
+    ),
+    project: Project = Depends(retrieve_project),
+):
+    return upload_session_service.complete(upload_session_id, project)
+
+
+@router.delete("/uploads/{id}", response_model=dto.UploadSession)
+def abort_upload_session(
+    upload_session_id: int = Path(alias="id"),
+    upload_session_service: UploadSessionService = Depends(
+        get_upload_session_service_instance
+    ),
+    project: Project = Depends(retrieve_project),
+):
+    return upload_session_service.abort(upload_session_id, project)
+
+
+@router.get("/{id}/stats", response_model=dict)
+def get_file_stats(
+    file_id: int = Path(alias="id"),
+    file_service: FileService = Depends(get_file_service_instance),
+    project: Project = Depends(retrieve_project),
+):
+    return file_service.get_stats(file_id, project)
+
+
+@router.get("/{id}/tiles/{z}/{x}/{y}.png", response_class=Response)
+def get_file_tile(
+    file_id: int = Path(alias="id"),
+    z: int = Path(ge=0),
+    x: int = Path(ge=0),
+    y: int = Path(ge=0),
+    project: Project = Depends(retrieve_project),
+    tile_service: TileService = Depends(get_tile_service_instance),
+):
+    return Response(
+        tile_service.get_file_tile(file_id, project, z, x, y),
+        media_type="image/png",
+        headers={"Cache-Control": "private, max-age=31536000, immutable"},
+    )
+
+
 @router.delete(
     "/delete/{id}", response_model=dict, status_code=status.HTTP_202_ACCEPTED
 )
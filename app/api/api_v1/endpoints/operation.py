@@ -1,29 +1,55 @@
-from fastapi import APIRouter, Body, Depends, HTTPException, Path, Query, status
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    Path,
+    Query,
+    Response,
+    status,
+)
 
 from app import dto
 from app.api.api_v1.deps import (
     authenticate_user,
+    get_operation_job_service_instance,
     get_operation_service_instance,
     get_project_service_instance,
+    get_tile_service_instance,
+    get_user_service_instance,
     retrieve_project,
 )
-from app.models import OperationOutput, Project
-from app.schemas import Bands
+from app.config import settings
+from app.models import OperationJob, OperationOutput, Project, User
+from app.schemas import Bands, OutputFormat, RegionOfInterest
 from app.services.operation import Operation
+from app.services.operation_job import OperationJobService
 from app.services.project import ProjectService
+from app.services.result_cache import operation_flights, result_cache
+from app.services.tile import TileService
+from app.services.user import UserService
 
 router = APIRouter()
 
 
 @router.post("/", response_model=dto.OperationOutput)
-async def operation(
+def operation(
     bands: Bands,
+    response: Response,
     tif_file: int | None = Body(default=None),
+    roi: RegionOfInterest | None = Body(default=None),
     project: Project = Depends(retrieve_project),
     operation_service: Operation = Depends(get_operation_service_instance),
     operation_type: str = Query(),
     title: str = Query(max_length=50),
     extra_params: dict | None = None,
+    output_format: OutputFormat = Query(default=OutputFormat.png),
+    preview: bool = Query(default=False),
+    preview_size: int = Query(default=settings.operation_preview_size, ge=64),
+    refine: bool = Query(default=False),
+    operation_job_service: OperationJobService = Depends(
+        get_operation_job_service_instance
+    ),
     project_service: ProjectService = Depends(get_project_service_instance),
     user=Depends(authenticate_user),
 ) -> OperationOutput:
@@ -35,8 +61,25 @@ async def operation(
         title=title,
         project=project,
         extra_params=extra_params,
+        output_format=output_format,
+        roi=roi,
+        preview_size=preview_size if preview else None,
     )
 
+    if preview and refine:
+        # Queue the full resolution run; the client polls /jobs/{id}
+        job = operation_job_service.submit(
+            tif_file=tif_file,
+            bands=bands,
+            operation_type=operation_type,
+            title=title,
+            project=project,
+            extra_params=extra_params,
+            output_format=output_format,
+            roi=roi,
+        )
+        response.headers["X-Operation-Job"] = str(job.id)
+
     # Update modified_at time project
     project_service.change_updated_at_time(
         _id=project.id, user=user, last_action=operation_type
@@ -45,6 +88,75 @@ async def operation(
     return file_model
 
 
+@router.post(
+    "/jobs", response_model=dto.OperationJob, status_code=status.HTTP_202_ACCEPTED
+)
+def submit_operation_job(
+    bands: Bands,
+    tif_file: int | None = Body(default=None),
+    roi: RegionOfInterest | None = Body(default=None),
+    project: Project = Depends(retrieve_project),
+    operation_job_service: OperationJobService = Depends(
+        get_operation_job_service_instance
+    ),
+    operation_type: str = Query(),
+    title: str = Query(max_length=50),
+    extra_params: dict | None = None,
+    output_format: OutputFormat = Query(default=OutputFormat.png),
+) -> OperationJob:
+    return operation_job_service.submit(
+        tif_file=tif_file,
+        bands=bands,
+        operation_type=operation_type,
+        title=title,
+        project=project,
+        extra_params=extra_params,
+        output_format=output_format,
+        roi=roi,
+    )
+
+
+@router.get("/jobs/{id}", response_model=dto.OperationJob)
+def get_operation_job(
+    _id: int = Path(alias="id"),
+    project: Project = Depends(retrieve_project),
+    operation_job_service: OperationJobService = Depends(
+        get_operation_job_service_instance
+    ),
+) -> OperationJob:
+    return operation_job_service.get(_id=_id, project=project)
+
+
+@router.get("/{id}/tiles/{z}/{x}/{y}.png", response_class=Response)
+def get_operation_output_tile(
+    _id: int = Path(alias="id"),
+    z: int = Path(ge=0),
+    x: int = Path(ge=0),
+    y: int = Path(ge=0),
+    project: Project = Depends(retrieve_project),
+    tile_service: TileService = Depends(get_tile_service_instance),
+):
+    return Response(
+        tile_service.get_operation_output_tile(_id, project, z, x, y),
+        media_type="image/png",
+        headers={"Cache-Control": "private, max-age=31536000, immutable"},
+    )
+
+
+@router.get("/cache", response_model=dict)
+def get_operation_cache_stats(
+    user: User = Depends(authenticate_user),
+    user_service: UserService = Depends(get_user_service_instance),
+) -> dict:
+    # Cache statistics span every user's operations, so only admins see them
+    if user_service.check_user_admin(user.id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="You do not have permission to view the operation cache.",
+        )
+    return {**result_cache.stats(), "coalesced": operation_flights.coalesced}
+
+
 @router.delete("/delete/{id}", response_model=dict)
 async def delete_operation_output(
     _id: int = Path(alias="id"),
@@ -1,6 +1,6 @@
 from functools import lru_cache
 
-from pydantic import PostgresDsn, field_validator, computed_field
+from pydantic import PostgresDsn, field_validator
 from pydantic_core.core_schema import FieldValidationInfo
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -38,15 +38,63 @@ class Settings(BaseSettings):
     OBJECT_STORAGE_BUCKET_NAME: str
     OBJECT_STORAGE_URL: str
 
-    cache_folder: str | None = None
-    max_cache_folder_size: int = 10  # In GB
     local_save_files: str
+    # Downloaded input files kept in local_save_files/objects
+    object_cache_max_size: int = 20  # In GB
+    # Decoded input bands kept in local_save_files/arrays (0 = disabled)
+    array_cache_max_size: int = 20  # In GB
+    # Overview pyramids of files and outputs kept in local_save_files/pyramids
+    pyramid_cache_max_size: int = 10  # In GB
 
-    @computed_field(return_type=bool)
-    @property
-    def cache_file_enabled(self):
-        return bool(self.cache_folder)
+    # Memory map uncompressed TIFF bands instead of decoding them
+    openrs_memmap: bool = True
+    # Calculators process scenes in tiles of this many pixels per side
+    openrs_tile_size: int = 2048
+    # Write tiled results to a .npy scratch file instead of keeping them in RAM
+    openrs_tile_spill_to_disk: bool = False
+    # Threads one pixel-wise operation may use for its tiles (0 = all cores)
+    openrs_tile_workers: int = 0
+    # Cap on tile threads of all operations together (0 = all cores); each
+    # compute worker gets an equal share, at least one thread
+    openrs_max_tile_threads: int = 0
 
+    # Threads orchestrating submitted operation jobs (download, upload)
+    operation_job_workers: int = 4
+    # Warm worker processes running calculators (0 = one per core)
+    compute_workers: int = 0
+    # Operations a compute worker runs before it is replaced
+    compute_max_tasks_per_child: int = 50
+
+    # Reuse outputs of identical operations on the same inputs
+    operation_cache_enabled: bool = True
+    operation_cache_ttl: int = 7 * 24 * 3600  # In seconds
+    # Cache keys kept in the in-process index (the database holds all keys)
+    operation_cache_max_entries: int = 10000
+    # Default longer side, in pixels, of the inputs of preview operations
+    operation_preview_size: int = 1024
+
+    # Uploads are streamed in parts of this many bytes (S3 needs >= 5 MiB)
+    upload_chunk_size: int = 8 * 1024 * 1024
+    # Parts of one upload sent to object storage at the same time
+    upload_concurrency: int = 4
+    # Largest file of a user and of a premium user in a resumable upload
+    # session, meant for scenes over the regular upload limits
+    max_size_upload_session: int = 10**9
+    max_size_upload_session_premium: int = 5 * (10**10)
+    # Smallest part size of upload sessions; it grows for files that would
+    # need more than the 10000 parts S3 allows
+    upload_session_part_size: int = 64 * 1024 * 1024
+
+    # Input files of one operation downloaded at the same time
+    download_concurrency: int = 6
+    # Objects larger than this are downloaded as ranged GETs of this size
+    download_part_size: int = 16 * 1024 * 1024
+    # Ranged GETs of one object in flight
+    download_range_concurrency: int = 4
+    # Connections each S3 client keeps open to its location
+    s3_max_pool_connections: int = 32
+
+    # Largest regular upload of a user and of a premium user
     max_size_file: int = 5 * (10**7)
     max_size_file_premium: int = 2 * (10**8)
 
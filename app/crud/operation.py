@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from sqlalchemy.orm import Session
 
 from app.models import OperationOutput, Project
@@ -15,12 +17,38 @@ class OperationCrud:
     def get(db: Session, _id: int) -> OperationOutput | None:
         return db.query(OperationOutput).filter(OperationOutput.id == _id).first()
 
+    @staticmethod
+    def get_in_project(
+        db: Session, _id: int, project: Project
+    ) -> OperationOutput | None:
+        return (
+            db.query(OperationOutput)
+            .filter(OperationOutput.id == _id)
+            .filter(OperationOutput.project == project)
+            .filter(OperationOutput.deleted_at.is_(None))
+            .first()
+        )
+
     @staticmethod
     def get_by_name(db: Session, filename: str, project: Project):
         return (db.query(OperationOutput)
                 .filter(OperationOutput.filename == filename)
                 .filter(OperationOutput.project == project).first())
 
+    @staticmethod
+    def get_by_cache_key(
+        db: Session, cache_key: str, project: Project, created_after: datetime
+    ) -> OperationOutput | None:
+        return (
+            db.query(OperationOutput)
+            .filter(OperationOutput.cache_key == cache_key)
+            .filter(OperationOutput.project == project)
+            .filter(OperationOutput.deleted_at.is_(None))
+            .filter(OperationOutput.created_at >= created_after)
+            .order_by(OperationOutput.created_at.desc())
+            .first()
+        )
+
     @staticmethod
     def get_by_project(db: Session, project: Project):
         return db.query(OperationOutput).filter(OperationOutput.project == project).first()
@@ -0,0 +1,53 @@
+from sqlalchemy.orm import Session
+
+from app.models import OperationJob, OperationJobStatus, Project
+
+
+class OperationJobCrud:
+    @staticmethod
+    def create(db: Session, job: OperationJob) -> OperationJob:
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job
+
+    @staticmethod
+    def get(db: Session, _id: int) -> OperationJob | None:
+        return db.query(OperationJob).filter(OperationJob.id == _id).first()
+
+    @staticmethod
+    def get_by_project(db: Session, _id: int, project: Project) -> OperationJob | None:
+        return (
+            db.query(OperationJob)
+            .filter(OperationJob.id == _id)
+            .filter(OperationJob.project == project)
+            .first()
+        )
+
+    @staticmethod
+    def update(db: Session, job: OperationJob) -> OperationJob:
+        job = db.merge(job)
+        db.commit()
+        db.refresh(job)
+        return job
+
+    @staticmethod
+    def fail_unfinished(db: Session, error: str) -> int:
+        """Mark every pending or running job as failed; returns how many."""
+        count = (
+            db.query(OperationJob)
+            .filter(
+                OperationJob.status.in_(
+                    [OperationJobStatus.pending, OperationJobStatus.running]
+                )
+            )
+            .update(
+                {
+                    OperationJob.status: OperationJobStatus.failed,
+                    OperationJob.error: error,
+                },
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        return count
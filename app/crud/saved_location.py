@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 
 from app.models import SavedLocation
+from app.utils import s3
 
 
 class SavedLocationCrud:
@@ -34,4 +35,6 @@ class SavedLocationCrud:
         saved_location = db.merge(saved_location)
         db.commit()
         db.refresh(saved_location)
+        # Pooled clients hold the old endpoint and credentials
+        s3.invalidate(saved_location.id)
         return saved_location
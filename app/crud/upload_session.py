@@ -0,0 +1,28 @@
+from sqlalchemy.orm import Session
+
+from app.models import Project, UploadSession
+
+
+class UploadSessionCrud:
+    @staticmethod
+    def create(db: Session, upload_session: UploadSession) -> UploadSession:
+        db.add(upload_session)
+        db.commit()
+        db.refresh(upload_session)
+        return upload_session
+
+    @staticmethod
+    def get_by_project(db: Session, _id: int, project: Project) -> UploadSession | None:
+        return (
+            db.query(UploadSession)
+            .filter(UploadSession.id == _id)
+            .filter(UploadSession.project == project)
+            .first()
+        )
+
+    @staticmethod
+    def update(db: Session, upload_session: UploadSession) -> UploadSession:
+        upload_session = db.merge(upload_session)
+        db.commit()
+        db.refresh(upload_session)
+        return upload_session
@@ -7,6 +7,7 @@ from pydantic import EmailStr as PydanticEmailStr
 
 from app import schemas
 from app.config import settings
+from app.models import OperationJobStatus, UploadSessionStatus
 
 
 class EmailStr(PydanticEmailStr):
@@ -22,6 +23,7 @@ class File(BaseModel):
     filename: str
     unique_name: UUID4
     extension: str
+    checksum: str | None = None
 
     @computed_field(return_type=str)
     def thumbnail_path(self):
@@ -68,6 +70,46 @@ class OperationOutput(BaseModel):
         from_attributes = True
 
 
+class OperationJob(BaseModel):
+    id: int
+    operation_type: str
+    title: str
+    status: OperationJobStatus
+    error: str | None = None
+    operation_output: OperationOutput | None = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class UploadPart(BaseModel):
+    part_number: int
+    size: int
+    etag: str
+
+
+class UploadSession(BaseModel):
+    id: int
+    filename: str
+    extension: str
+    size: int
+    part_size: int
+    status: UploadSessionStatus
+    file: File | None = None
+    # Parts already received, so an interrupted client knows what to resend
+    parts: list[UploadPart] = []
+    created_at: datetime
+
+    @computed_field(return_type=int)
+    def part_count(self):
+        return max(-(-self.size // self.part_size), 1)
+
+    class Config:
+        from_attributes = True
+
+
 class Project(schemas.Project):
     id: int
     created_at: datetime
@@ -3,6 +3,7 @@ import logging
 from sqlalchemy.orm import Session
 
 from app.config import settings
+from app.crud.operation_job import OperationJobCrud
 from app.crud.saved_location import SavedLocationCrud
 from app.databese import engine
 from app.models import SavedLocation, SavedLocationType
@@ -28,10 +29,19 @@ def init_saved_location(db: Session):
     SavedLocationCrud.activate_location(db, location_model.id)
 
 
+def fail_interrupted_jobs(db: Session):
+    # Jobs run in the server process, so none can still be running before it
+    # starts: whatever is left pending or running was lost with the last one
+    count = OperationJobCrud.fail_unfinished(db, "Interrupted by a server restart")
+    if count:
+        logger.info("Marked %s interrupted operation jobs as failed", count)
+
+
 def init():
     logger.info("Create initial saved location data")
     init_saved_location(Session(bind=engine, autoflush=False, autocommit=False))
     logger.info("Initial saved location data created")
+    fail_interrupted_jobs(Session(bind=engine, autoflush=False, autocommit=False))
 
 
 if __name__ == "__main__":
@@ -1,7 +1,16 @@
 import enum
 from datetime import datetime
 
-from sqlalchemy import UUID, BigInteger, Boolean, Enum, ForeignKey, String, func
+from sqlalchemy import (
+    JSON,
+    UUID,
+    BigInteger,
+    Boolean,
+    Enum,
+    ForeignKey,
+    String,
+    func,
+)
 from sqlalchemy.dialects.postgresql import TIMESTAMP
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
@@ -20,6 +29,21 @@ class SavedLocationType(enum.Enum):
     internal = "internal"
 
 
+class OperationJobStatus(enum.Enum):
+    pending = "pending"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+
+class UploadSessionStatus(enum.Enum):
+    open = "open"
+    completed = "completed"
+    aborted = "aborted"
+    # Assembled, but the file could not be processed; the object is deleted
+    failed = "failed"
+
+
 class TimeMixin:
     created_at: Mapped[datetime] = mapped_column(TIMESTAMP, default=func.now())
     updated_at: Mapped[datetime] = mapped_column(
@@ -91,6 +115,11 @@ class File(Base, TimeMixin):
     filename: Mapped[str] = mapped_column(String(100))
     unique_name: Mapped[UUID] = mapped_column(UUID(as_uuid=True), unique=True)
     extension: Mapped[str] = mapped_column(String(10))
+    # SHA-256 of the uploaded content
+    checksum: Mapped[str] = mapped_column(String(64), nullable=True)
+    # Pixel statistics computed at upload (see openrs.file_handler.raster_stats);
+    # deferred, so listings do not load the histograms
+    stats: Mapped[dict] = mapped_column(JSON, nullable=True, deferred=True)
 
     project_id: Mapped[int] = mapped_column(
         BigInteger,
@@ -115,6 +144,10 @@ class OperationOutput(Base, TimeMixin):
     title: Mapped[str] = mapped_column(String(255), unique=False)
     unique_name: Mapped[UUID] = mapped_column(UUID(as_uuid=True), unique=True)
     extension: Mapped[str] = mapped_column(String(10))
+    # Hash of the inputs and parameters that produced this output
+    cache_key: Mapped[str] = mapped_column(String(64), nullable=True, index=True)
+    # PNG renders also store the raw result as {unique_name}.npy, to tile it
+    has_raster: Mapped[bool] = mapped_column(Boolean, default=False)
 
     project_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("projects.id"))
     location_id: Mapped[int] = mapped_column(
@@ -127,6 +160,59 @@ class OperationOutput(Base, TimeMixin):
     location: Mapped["SavedLocation"] = relationship("SavedLocation")
 
 
+class OperationJob(Base, TimeMixin):
+    __tablename__ = "operation_jobs"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+
+    operation_type: Mapped[str] = mapped_column(String(50))
+    title: Mapped[str] = mapped_column(String(255))
+    # Bands, tif_file and extra_params of the submitted request
+    parameters: Mapped[dict] = mapped_column(JSON)
+    status: Mapped[OperationJobStatus] = mapped_column(
+        Enum(OperationJobStatus), default=OperationJobStatus.pending
+    )
+    error: Mapped[str] = mapped_column(String, nullable=True)
+
+    project_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("projects.id"))
+    operation_output_id: Mapped[int] = mapped_column(
+        BigInteger, ForeignKey("operation_output.id"), nullable=True
+    )
+
+    project: Mapped[Project] = relationship("Project")
+    operation_output: Mapped[OperationOutput] = relationship("OperationOutput")
+
+
+class UploadSession(Base, TimeMixin):
+    __tablename__ = "upload_sessions"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+
+    filename: Mapped[str] = mapped_column(String(100))
+    unique_name: Mapped[UUID] = mapped_column(UUID(as_uuid=True), unique=True)
+    extension: Mapped[str] = mapped_column(String(10))
+    size: Mapped[int] = mapped_column(BigInteger)
+    # Every part but the last has exactly this many bytes
+    part_size: Mapped[int] = mapped_column(BigInteger)
+    # Id of the S3 multipart upload the parts are sent to
+    upload_id: Mapped[str] = mapped_column(String)
+    status: Mapped[UploadSessionStatus] = mapped_column(
+        Enum(UploadSessionStatus), default=UploadSessionStatus.open
+    )
+
+    project_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("projects.id"))
+    location_id: Mapped[int] = mapped_column(
+        BigInteger, ForeignKey("saved_locations.id")
+    )
+    file_id: Mapped[int] = mapped_column(
+        BigInteger, ForeignKey("files.id"), nullable=True
+    )
+
+    project: Mapped[Project] = relationship("Project")
+    location: Mapped["SavedLocation"] = relationship("SavedLocation")
+    file: Mapped[File] = relationship("File")
+
+
 class SavedLocation(Base, TimeMixin):
     __tablename__ = "saved_locations"
 
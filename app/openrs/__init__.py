@@ -0,0 +1,3 @@
+# Bump whenever a calculator or export changes its output, so cached
+# operation results produced by older code are not reused.
+__version__ = "2"
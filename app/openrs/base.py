@@ -1,14 +1,91 @@
 from pathlib import Path
 
+import numpy as np
+
 from .file_handler import OpenFiles
+from .tiling import (
+    DEFAULT_TILE_SIZE,
+    Window,
+    create_output,
+    iter_windows,
+    map_windows,
+)
 
 
 class Base:
+    # Pixels of context calculate_window needs around a window (neighborhood
+    # operations set this to their kernel radius)
+    tile_halo: int = 0
+    # Pixel-wise calculators set this to fan their tiles out across threads
+    tile_parallel: bool = False
+
     def __init__(self, files: OpenFiles):
         self.files = files
+        self.tile_size = DEFAULT_TILE_SIZE
+        self.tile_output_path: Path | None = None
+        self.tile_workers = 1
+
+    @classmethod
+    def reads_pixels(cls, extra_params: dict | None) -> bool:
+        """
+        Whether calculate reads pixels.
+
+        Calculators that can work from precomputed band statistics alone
+        return False, so their inputs need not be downloaded when every
+        band has statistics.
+        """
+        return True
 
     def calculate(self, extra_params: dict):
         pass
 
+    def calculate_window(self, window: Window, extra_params: dict) -> np.ndarray:
+        """Compute the result for one window of the scene."""
+        raise NotImplementedError("Calculator does not support tiled execution")
+
+    def calculate_tiled(self, extra_params: dict, band: str) -> np.ndarray:
+        """
+        Run calculate_window over the scene tile by tile.
+
+        ``band`` is the input whose shape defines the scene. Each tile is
+        computed on a window grown by ``tile_halo`` and cropped back, so the
+        result matches a whole-scene computation while peak memory only
+        depends on ``tile_size``. When ``tile_output_path`` is set the result
+        is written incrementally to that ``.npy`` file.
+
+        For calculators with ``tile_parallel`` the tiles after the first are
+        computed on up to ``tile_workers`` threads.
+        """
+        height, width = self.files.get_shape(band)
+
+        def compute(window: Window) -> tuple[Window, np.ndarray]:
+            expanded, inner = window.expand(self.tile_halo, height, width)
+            return window, self.calculate_window(expanded, extra_params)[inner]
+
+        windows = iter_windows(height, width, self.tile_size)
+        # The first tile runs on the calling thread: it sizes the output and
+        # loads every band the calculator reads before threads share them.
+        window, tile = compute(next(windows))
+        output = create_output(
+            (height, width) + tile.shape[2:], tile.dtype, self.tile_output_path
+        )
+        output[window.slices] = tile
+
+        workers = self.tile_workers if self.tile_parallel else 1
+        for window, tile in map_windows(compute, windows, workers):
+            output[window.slices] = tile
+        if isinstance(output, np.memmap):
+            output.flush()
+        return output
+
     def export(self, file_path: Path, title: str):
         pass
+
+    def raster(self, result) -> np.ndarray | None:
+        """
+        The numeric result written for raw output formats.
+
+        ``result`` is what calculate returned; calculators whose result is
+        not an image (or not shaped like one) override this.
+        """
+        return result if isinstance(result, np.ndarray) else None
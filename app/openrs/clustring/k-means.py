@@ -11,7 +11,7 @@ from app.openrs.file_handler import OpenFiles
 
 class KMeansCalculator(Base):
     def __init__(self, files: OpenFiles):
-        if files.nir_band is None:
+        if files.nir_path is None:
             raise Exception("Nir band are required")
         super().__init__(files)
         self.normalized_bands = self.files.get_normalize_bands()
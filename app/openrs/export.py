@@ -1,6 +1,39 @@
+from functools import lru_cache
+
 import matplotlib.pyplot as plt
-from matplotlib import cm
+import numpy as np
+import tifffile
+from matplotlib import cm, colormaps
 from numpy import ndarray
+from PIL import Image, ImageDraw, ImageFont
+
+
+RASTER_EXTENSIONS = {"tiff": "tif", "npy": "npy"}
+
+
+def save_raster(_input: ndarray, file_path: str, output_format: str) -> None:
+    """
+    Write the raw values of a result array.
+
+    ``tiff`` writes a zlib-compressed TIFF in 256 x 256 tiles (one plane per
+    channel), so readers can decode single windows. ``npy`` writes a plain
+    NumPy file, which can be memory mapped or read by byte range.
+    """
+    if output_format == "npy":
+        np.save(file_path, _input)
+    elif output_format == "tiff":
+        planar = _input.ndim == 3
+        tifffile.imwrite(
+            file_path,
+            np.moveaxis(_input, -1, 0) if planar else _input,
+            photometric="minisblack",
+            planarconfig="separate" if planar else None,
+            compression="zlib",
+            tile=(256, 256),
+            bigtiff=_input.nbytes > 2**31,
+        )
+    else:
+        raise ValueError(f"Unknown raster output format {output_format}")
 
 
 class BaseExport:
@@ -40,3 +73,189 @@ class PlotExport(BaseExport):
         plt.axis('off')
         plt.savefig(file_path)
         plt.close()
+
+
+@lru_cache(maxsize=None)
+def colormap_lut(cmap: str = "gray") -> np.ndarray:
+    """
+    256 x 3 uint8 lookup table of a matplotlib colormap.
+
+    Evaluated once per colormap; rendering then only indexes this table,
+    which needs no figure and is safe to use from several threads.
+    """
+    colors = colormaps[cmap](np.linspace(0.0, 1.0, 256))[:, :3]
+    return np.round(colors * 255).astype(np.uint8)
+
+
+def quantize(
+    _input: ndarray, vmin: float | None = None, vmax: float | None = None
+) -> tuple[ndarray, float, float]:
+    """
+    Scale an array linearly to uint8 between vmin and vmax.
+
+    The limits default to the finite data range (what imshow uses); NaN and
+    infinite pixels map to 0. Returns the quantized array and the limits.
+    """
+    finite = np.isfinite(_input)
+    if vmin is None or vmax is None:
+        values = _input[finite] if not finite.all() else _input
+        data_min, data_max = (
+            (float(values.min()), float(values.max())) if values.size else (0.0, 1.0)
+        )
+        vmin = data_min if vmin is None else vmin
+        vmax = data_max if vmax is None else vmax
+
+    scale = 255.0 / (vmax - vmin) if vmax > vmin else 0.0
+    scaled = (_input.astype(np.float32) - np.float32(vmin)) * np.float32(scale)
+    np.clip(scaled, 0, 255, out=scaled)
+    scaled[~finite] = 0
+    return scaled.astype(np.uint8), vmin, vmax
+
+
+def to_rgb(_input: ndarray) -> ndarray:
+    """Convert an RGB(A) array the way imshow would: floats in [0, 1], ints in [0, 255]."""
+    rgb = _input[..., :3]
+    if np.issubdtype(rgb.dtype, np.floating):
+        return (np.clip(np.nan_to_num(rgb), 0.0, 1.0) * 255).astype(np.uint8)
+    return np.clip(rgb, 0, 255).astype(np.uint8)
+
+
+class LUTExport(BaseExport):
+    """
+    Render arrays to PNG without matplotlib figures.
+
+    Single-band arrays are quantized to uint8 and colored through a
+    precomputed colormap lookup table; RGB arrays are written as-is. A title
+    bar, a colorbar strip and a histogram panel can be added around the
+    image, and the result is encoded with Pillow. Gray images are written as
+    8-bit grayscale PNGs, a third of the size to encode of RGB.
+    """
+
+    def __init__(self, compress_level: int = 1):
+        super().__init__()
+        self.compress_level = compress_level
+
+    def render(
+        self,
+        _input: ndarray,
+        title: str = "",
+        cmap: str = "gray",
+        use_colorbar: bool = True,
+        use_histogram: bool = False,
+    ) -> Image.Image:
+        if _input.ndim == 3 and _input.shape[2] == 1:
+            _input = _input[:, :, 0]
+
+        if _input.ndim == 3:
+            image = Image.fromarray(to_rgb(_input), mode="RGB")
+            quantized = None
+            use_colorbar = False
+        else:
+            quantized, vmin, vmax = quantize(_input)
+            if cmap == "gray":
+                image = Image.fromarray(quantized, mode="L")
+            else:
+                image = Image.fromarray(colormap_lut(cmap)[quantized], mode="RGB")
+
+        panels = [image]
+        if use_colorbar:
+            panels.append(self._colorbar(image, cmap, vmin, vmax))
+        if use_histogram:
+            if quantized is None:
+                quantized, _, _ = quantize(_input)
+            panels.append(self._histogram(image, quantized))
+
+        return self._compose(panels, title)
+
+    def show(
+        self, _input: ndarray, title: str, cmap: str = "gray", use_colorbar: bool = True
+    ) -> None:
+        self.render(_input, title, cmap, use_colorbar).show()
+
+    def save(
+        self,
+        _input: ndarray,
+        title: str,
+        cmap: str = "gray",
+        use_colorbar: bool = True,
+        file_path: str = "data/save.png",
+        use_histogram: bool = False,
+    ) -> None:
+        image = self.render(_input, title, cmap, use_colorbar, use_histogram)
+        image.save(file_path, format="PNG", compress_level=self.compress_level)
+
+    @staticmethod
+    def _font(height: int) -> ImageFont.ImageFont:
+        return ImageFont.load_default(size=max(height // 40, 12))
+
+    @staticmethod
+    def _colors(mode: str) -> tuple:
+        """Background (white) and foreground (black) colors for an image mode."""
+        return (255, 0) if mode == "L" else ((255, 255, 255), (0, 0, 0))
+
+    def _colorbar(
+        self, image: Image.Image, cmap: str, vmin: float, vmax: float
+    ) -> Image.Image:
+        height = image.height
+        background, foreground = self._colors(image.mode)
+        font = self._font(height)
+        bar_width = max(height // 40, 12)
+        labels = [f"{vmax:.4g}", f"{(vmin + vmax) / 2:.4g}", f"{vmin:.4g}"]
+        label_width = max(int(font.getlength(label)) for label in labels)
+        strip = Image.new(image.mode, (bar_width * 2 + label_width, height), background)
+
+        # Top of the bar is vmax, like matplotlib's vertical colorbar
+        levels = np.linspace(255, 0, height).astype(np.uint8)
+        gradient = levels if image.mode == "L" else colormap_lut(cmap)[levels]
+        bar = np.repeat(gradient[:, np.newaxis], bar_width, axis=1)
+        strip.paste(Image.fromarray(bar, mode=image.mode), (bar_width // 2, 0))
+
+        draw = ImageDraw.Draw(strip)
+        x = bar_width * 3 // 2 + 2
+        for label, (y, anchor) in zip(
+            labels, ((0, "la"), (height // 2, "lm"), (height, "ld"))
+        ):
+            draw.text((x, y), label, fill=foreground, font=font, anchor=anchor)
+        return strip
+
+    def _histogram(self, image: Image.Image, quantized: ndarray) -> Image.Image:
+        height = image.height
+        background, foreground = self._colors("L")
+        counts = np.bincount(quantized.ravel(), minlength=256).astype(np.float64)
+        panel_height = max(height // 2, 64)
+        bar_heights = np.round(counts / max(counts.max(), 1) * (panel_height - 1))
+
+        # 256 bars, one pixel wide each, bottom-aligned in black on white
+        rows = np.arange(panel_height)[::-1, np.newaxis]
+        panel = np.where(rows < bar_heights[np.newaxis, :], foreground, background)
+        histogram = Image.fromarray(panel.astype(np.uint8), mode="L")
+        histogram = histogram.resize((panel_height, panel_height), Image.NEAREST)
+
+        strip = Image.new("L", (panel_height + 16, height), background)
+        strip.paste(histogram, (8, (height - panel_height) // 2))
+        return strip.convert(image.mode)
+
+    def _compose(self, panels: list[Image.Image], title: str) -> Image.Image:
+        mode = panels[0].mode
+        background, foreground = self._colors(mode)
+        height = panels[0].height
+        font = self._font(height)
+        title_height = int(font.size * 2) if title else 0
+        width = sum(panel.width for panel in panels)
+        if len(panels) == 1 and not title:
+            return panels[0]
+
+        canvas = Image.new(mode, (width, height + title_height), background)
+        x = 0
+        for panel in panels:
+            canvas.paste(panel, (x, title_height))
+            x += panel.width
+        if title:
+            ImageDraw.Draw(canvas).text(
+                (panels[0].width // 2, title_height // 2),
+                title,
+                fill=foreground,
+                font=font,
+                anchor="mm",
+            )
+        return canvas
@@ -1,40 +1,423 @@
+import math
 import os
+from collections.abc import Mapping
+from functools import cached_property
 
-import matplotlib.pyplot as plt
 import numpy as np
+import tifffile
 from skimage import io
 
+from .tiling import Window
 
-def _load_image(path: str) -> np.ndarray | None:
+BAND_NAMES = ("blue", "green", "nir", "red", "swir1", "swir2")
+
+
+def _read_raster(path: str | None, memmap: bool = False) -> np.ndarray | None:
     if not path:
         return None
     if not os.path.exists(path):
         raise FileNotFoundError(f"File {path} not found")
-    return io.imread(path).astype(float)
+    if str(path).endswith(".npy"):
+        # Overview levels and raw operation results
+        return np.load(path, mmap_mode="r" if memmap else None)
+    if memmap:
+        raster = _memmap_raster(path)
+        if raster is not None:
+            return raster
+    return io.imread(path)
+
+
+def _memmap_raster(path: str) -> np.ndarray | None:
+    """
+    Map an uncompressed, contiguously stored TIFF read-only into memory.
+
+    The returned array is a zero-copy view on the OS page cache, so workers
+    opening the same scene share its pages. Returns None when the file
+    cannot be mapped (compressed, tiled or otherwise non-contiguous data),
+    in which case the caller falls back to a regular decode.
+    """
+    try:
+        return tifffile.memmap(path, mode="r")
+    except (ValueError, tifffile.TiffFileError):
+        return None
 
 
-def _data_image(path: str | None) -> dict | None:
-    if path:
-        image = plt.imread(path)
-        image_skimage = io.imread(path)
+def _read_shape(path: str) -> tuple[int, ...]:
+    """Read the raster shape from the file header without decoding pixels."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"File {path} not found")
+    if str(path).endswith(".npy"):
+        return np.load(path, mmap_mode="r").shape
+    try:
+        with tifffile.TiffFile(path) as tif:
+            return tif.series[0].shape
+    except tifffile.TiffFileError:
+        return _read_raster(path).shape
+
+
+def read_georeference(path: str) -> dict | None:
+    """GeoTIFF pixel scale and tie point of ``path``, None if it has none."""
+    if str(path).endswith(".npy"):
+        return None
+    with tifffile.TiffFile(path) as tif:
+        tags = tif.pages[0].tags
+        pixel_scale = tags.get("ModelPixelScaleTag")
+        tiepoint = tags.get("ModelTiepointTag")
+        if pixel_scale is None or tiepoint is None:
+            return None
         return {
-            "image": image,
-            "skimage": image_skimage,
-            "height": image.shape[0],
-            "width": image.shape[1],
+            "pixel_scale": [float(v) for v in pixel_scale.value[:2]],
+            "tiepoint": [float(v) for v in tiepoint.value[:6]],
+        }
+
+
+def bbox_to_window(
+    path: str,
+    bbox: tuple[float, float, float, float],
+    georeference: dict | None = None,
+) -> Window:
+    """
+    Convert a (min_x, min_y, max_x, max_y) box to the pixel window covering it.
+
+    The box is in the raster's own coordinate system, mapped to pixels with
+    the GeoTIFF tie point and pixel scale tags of ``path``, or with
+    ``georeference`` (see ``read_georeference``) when the raster was
+    decoded to a file without tags.
+    """
+    if georeference is None:
+        georeference = read_georeference(path)
+    if georeference is None:
+        raise ValueError("The raster is not georeferenced, use a pixel window")
+
+    scale_x, scale_y = georeference["pixel_scale"]
+    col_0, row_0, _, x_0, y_0, _ = georeference["tiepoint"]
+    min_x, min_y, max_x, max_y = bbox
+    # Rows grow southwards, so the top of the window is max_y
+    left = math.floor((min_x - x_0) / scale_x + col_0)
+    right = math.ceil((max_x - x_0) / scale_x + col_0)
+    top = math.floor((y_0 - max_y) / scale_y + row_0)
+    bottom = math.ceil((y_0 - min_y) / scale_y + row_0)
+    return Window(top, left, bottom - top, right - left)
+
+
+def roi_window(
+    path: str,
+    window: Window | None = None,
+    bbox: tuple[float, float, float, float] | None = None,
+    georeference: dict | None = None,
+) -> Window:
+    """Resolve a region of interest to a pixel window clipped to the raster."""
+    if bbox is not None:
+        window = bbox_to_window(path, bbox, georeference)
+    height, width = _read_shape(path)[:2]
+    clipped = window.clip(height, width)
+    if clipped is None:
+        raise ValueError("The region of interest does not overlap the raster")
+    return clipped
+
+
+def _load_image(raster: np.ndarray | None) -> np.ndarray | None:
+    if raster is None:
+        return None
+    return raster.astype(float, copy=False)
+
+
+def _data_image(raster: np.ndarray | None) -> dict | None:
+    if raster is not None:
+        # "image" and "skimage" used to come from two separate decoders
+        # (matplotlib and skimage); both now share the single decoded buffer.
+        return {
+            "image": raster,
+            "skimage": raster,
+            "height": raster.shape[0],
+            "width": raster.shape[1],
             # "channels": image.shape[2] | None,
         }
     else:
         return {}
 
 
-def _normalize(image: np.ndarray) -> np.ndarray | None:
+def _min_max(image: np.ndarray, block_size: int = 2**20) -> tuple[float, float]:
+    """
+    Compute min and max in a single pass over the image.
+
+    The image is walked in row blocks of about ``block_size`` bytes, and both
+    reductions run on a block while it is still in cache.
+    """
+    row_size = max(image[:1].nbytes, 1)
+    block_rows = max(block_size // row_size, 1)
+    minimum, maximum = np.inf, -np.inf
+    for start in range(0, image.shape[0], block_rows):
+        block = image[start : start + block_rows]
+        minimum = np.minimum(minimum, block.min())
+        maximum = np.maximum(maximum, block.max())
+    return minimum, maximum
+
+
+STATS_PERCENTILES = (1, 2, 5, 25, 50, 75, 95, 98, 99)
+STATS_HISTOGRAM_BINS = 4096
+
+
+def read_nodata(path: str) -> float | None:
+    """The GDAL nodata value of a TIFF, None if it declares none."""
+    if str(path).endswith(".npy"):
+        return None
+    with tifffile.TiffFile(path) as tif:
+        tag = tif.pages[0].tags.get("GDAL_NODATA")
+        if tag is None:
+            return None
+        try:
+            return float(str(tag.value).strip("\x00 "))
+        except ValueError:
+            return None
+
+
+def _row_blocks(image: np.ndarray, block_size: int):
+    row_size = max(image[:1].nbytes, 1)
+    block_rows = max(block_size // row_size, 1)
+    for start in range(0, image.shape[0], block_rows):
+        yield image[start : start + block_rows]
+
+
+def _valid_pixels(block: np.ndarray, nodata: float | None) -> np.ndarray:
+    """The finite pixels of a block that are not ``nodata``, flattened."""
+    valid = np.isfinite(block) if block.dtype.kind == "f" else None
+    if nodata is not None and not math.isnan(nodata):
+        is_data = block != nodata
+        valid = is_data if valid is None else valid & is_data
+    return block.ravel() if valid is None else block[valid]
+
+
+def _json_number(value) -> float | None:
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+def raster_stats(
+    image: np.ndarray, nodata: float | None = None, block_size: int = 2**22
+) -> dict:
+    """
+    Statistics of a band, computed in two passes over row blocks.
+
+    Non-finite pixels and those equal to ``nodata`` are left out of
+    everything and counted in ``nodata_count``; min, max, mean and std are
+    exact over the other pixels. "raw_min" and "raw_max" are the range of
+    every pixel, fill included, exactly as normalization scans the band (None
+    when NaNs make it undefined), so bands normalize the same way with and
+    without stored statistics and always into [0, 1]. The histogram has ``STATS_HISTOGRAM_BINS`` equal
+    bins between min and max ("histogram_256" merges them 16 to one), and
+    the percentiles are interpolated in it, so they are exact to one bin.
+    """
+    count, mean, m2 = 0, 0.0, 0.0
+    minimum, maximum = np.inf, -np.inf
+    raw_minimum, raw_maximum = np.inf, -np.inf
+    nodata_count = 0
+    for block in _row_blocks(image, block_size):
+        if block.size:
+            raw_minimum = np.minimum(raw_minimum, block.min())
+            raw_maximum = np.maximum(raw_maximum, block.max())
+        size = block.size
+        block = _valid_pixels(block, nodata)
+        nodata_count += size - block.size
+        if not block.size:
+            continue
+        block = block.astype(np.float64, copy=False)
+        minimum = min(minimum, float(block.min()))
+        maximum = max(maximum, float(block.max()))
+        # Chan et al. pairwise update, stable for large counts
+        block_mean = float(block.mean())
+        block_m2 = float(np.square(block - block_mean).sum())
+        delta = block_mean - mean
+        total = count + block.size
+        mean += delta * block.size / total
+        m2 += block_m2 + delta**2 * count * block.size / total
+        count = total
+
+    stats = {
+        "count": count,
+        "nodata_count": nodata_count,
+        "nodata": nodata,
+        "raw_min": _json_number(raw_minimum),
+        "raw_max": _json_number(raw_maximum),
+    }
+    if not count:
+        return stats
+
+    histogram = np.zeros(STATS_HISTOGRAM_BINS, dtype=np.int64)
+    value_range = (minimum, maximum if maximum > minimum else minimum + 1)
+    for block in _row_blocks(image, block_size):
+        block = _valid_pixels(block, nodata)
+        histogram += np.histogram(block, STATS_HISTOGRAM_BINS, value_range)[0]
+
+    edges = np.linspace(*value_range, STATS_HISTOGRAM_BINS + 1)
+    cumulative = np.cumsum(histogram) / count
+    percentiles = {}
+    for p in STATS_PERCENTILES:
+        # Interpolated inside the bin that crosses p, within the pixel range
+        index = min(int(np.searchsorted(cumulative, p / 100)), len(histogram) - 1)
+        below = cumulative[index - 1] if index else 0.0
+        fraction = (p / 100 - below) / max(cumulative[index] - below, 1e-12)
+        value = edges[index] + fraction * (edges[index + 1] - edges[index])
+        percentiles[str(p)] = float(min(max(value, minimum), maximum))
+    stats.update(
+        {
+            "min": minimum,
+            "max": maximum,
+            "mean": mean,
+            "std": math.sqrt(m2 / count),
+            "percentiles": percentiles,
+            "histogram_range": list(value_range),
+            "histogram": histogram.tolist(),
+            "histogram_256": histogram.reshape(256, -1).sum(axis=1).tolist(),
+        }
+    )
+    return stats
+
+
+def _normalize(
+    image: np.ndarray,
+    dtype: np.dtype = np.float32,
+    min_max: tuple[float, float] | None = None,
+) -> np.ndarray | None:
     if image is None:
         return None
-    return (image - np.min(image)) / (np.max(image) - np.min(image))
+    minimum, maximum = min_max if min_max is not None else _min_max(image)
+    # astype always returns a fresh array here, so the rest can run in place
+    normalized = image.astype(dtype)
+    normalized -= minimum
+    normalized /= maximum - minimum
+    return normalized
+
+
+class _NormalizedBands(Mapping):
+    """Read-only mapping that normalizes a band only when it is looked up."""
+
+    def __init__(self, bands: dict[str, "_Band"], dtype: np.dtype):
+        self._bands = bands
+        self._dtype = dtype
+
+    def __getitem__(self, name: str) -> np.ndarray | None:
+        return self._bands[name].normalized(self._dtype)
+
+    def __iter__(self):
+        return iter(self._bands)
+
+    def __len__(self) -> int:
+        return len(self._bands)
+
+
+class _Band:
+    """
+    A band file that is only read from disk when first accessed.
+
+    With a ``window`` the band is that window of the file: memory-mapped
+    files only page in the rows of the window. ``stats`` are precomputed
+    statistics of the whole file; when they have its range ("raw_min" and
+    "raw_max", see ``raster_stats``) the band is normalized by it, also when
+    only a window or an overview of the file is read, so every run of an
+    operation stretches a file the same way.
+    """
+
+    def __init__(
+        self,
+        path: str | None,
+        memmap: bool = False,
+        window: Window | None = None,
+        stats: dict | None = None,
+    ):
+        self.path = path
+        self.memmap = memmap
+        self.window = window
+        self.stats = stats
+        self._normalized: dict[np.dtype, np.ndarray] = {}
+
+    @cached_property
+    def raster(self) -> np.ndarray | None:
+        raster = _read_raster(self.path, memmap=self.memmap)
+        if raster is not None and self.window is not None:
+            raster = raster[self.window.slices]
+        return raster
+
+    @cached_property
+    def data(self) -> np.ndarray | None:
+        return _load_image(self.raster)
+
+    @cached_property
+    def metadata(self) -> dict:
+        return _data_image(self.raster)
+
+    @cached_property
+    def min_max(self) -> tuple[float, float] | None:
+        if self.raster is None:
+            return None
+        if self.stats and self.stats.get("raw_min") is not None:
+            return self.stats["raw_min"], self.stats["raw_max"]
+        return _min_max(self.raster)
+
+    def normalized(self, dtype: np.dtype = np.float32) -> np.ndarray | None:
+        dtype = np.dtype(dtype)
+        if dtype not in self._normalized:
+            if self.raster is None:
+                return None
+            self._normalized[dtype] = _normalize(self.raster, dtype, self.min_max)
+        return self._normalized[dtype]
+
+    @property
+    def shape(self) -> tuple[int, ...] | None:
+        if not self.path:
+            return None
+        if "raster" in self.__dict__:
+            return self.raster.shape
+        shape = _read_shape(self.path)
+        if self.window is not None:
+            shape = (self.window.height, self.window.width) + tuple(shape[2:])
+        return shape
+
+
+def _band_attribute(name: str, attribute: str) -> property:
+    def getter(self: "OpenFiles"):
+        return getattr(self._bands[name], attribute)
+
+    return property(getter)
 
 
 class OpenFiles:
+    """
+    Lazy access to the input bands of an operation.
+
+    Nothing is read in the constructor: each band file is decoded once, in
+    its native dtype, the first time a calculator touches the band or its
+    metadata. Use the ``*_path`` attributes to check which bands were given.
+
+    With ``memmap=True`` uncompressed TIFFs are memory mapped instead of
+    decoded, and the raster/metadata views are zero-copy views of the file.
+
+    Normalized bands are computed per band on first lookup and memoized, in
+    ``normalize_dtype`` (float32 unless float64 is asked for).
+
+    With a ``window`` (see ``roi_window``) every band is restricted to that
+    pixel window, and calculators see it as the whole scene.
+
+    ``stats`` maps path arguments (``"red_path"``, ``"tif_file"``, ...) to
+    precomputed statistics of their files, used instead of scanning bands.
+    """
+
+    blue_band = _band_attribute("blue", "data")
+    green_band = _band_attribute("green", "data")
+    nir_band = _band_attribute("nir", "data")
+    red_band = _band_attribute("red", "data")
+    swir1_band = _band_attribute("swir1", "data")
+    swir2_band = _band_attribute("swir2", "data")
+    tif_file = _band_attribute("tif_file", "data")
+
+    blue_metadata = _band_attribute("blue", "metadata")
+    green_metadata = _band_attribute("green", "metadata")
+    nir_metadata = _band_attribute("nir", "metadata")
+    red_metadata = _band_attribute("red", "metadata")
+    swir1_metadata = _band_attribute("swir1", "metadata")
+    swir2_metadata = _band_attribute("swir2", "metadata")
+    tif_file_metadata = _band_attribute("tif_file", "metadata")
+
     def __init__(
         self,
         red_path: str | None = None,
@@ -44,22 +427,31 @@ class OpenFiles:
         swir1_path: str | None = None,
         swir2_path: str | None = None,
         tif_file: str | None = None,
+        memmap: bool = False,
+        normalize_dtype: np.dtype = np.float32,
+        window: Window | None = None,
+        stats: dict[str, dict] | None = None,
     ):
-        self.blue_band = _load_image(blue_path)
-        self.green_band = _load_image(green_path)
-        self.nir_band = _load_image(nir_path)
-        self.red_band = _load_image(red_path)
-        self.swir1_band = _load_image(swir1_path)
-        self.swir2_band = _load_image(swir2_path)
-        self.tif_file = _load_image(tif_file)
-
-        self.blue_metadata = _data_image(blue_path)
-        self.green_metadata = _data_image(green_path)
-        self.nir_metadata = _data_image(nir_path)
-        self.red_metadata = _data_image(red_path)
-        self.swir1_metadata = _data_image(swir1_path)
-        self.swir2_metadata = _data_image(swir2_path)
-        self.tif_file_metadata = _data_image(tif_file)
+        self.blue_path = blue_path
+        self.green_path = green_path
+        self.nir_path = nir_path
+        self.red_path = red_path
+        self.swir1_path = swir1_path
+        self.swir2_path = swir2_path
+        self.tif_file_path = tif_file
+        self.normalize_dtype = normalize_dtype
+        self.window = window
+
+        stats = stats or {}
+        self._bands = {
+            "blue": _Band(blue_path, memmap, window, stats.get("blue_path")),
+            "green": _Band(green_path, memmap, window, stats.get("green_path")),
+            "nir": _Band(nir_path, memmap, window, stats.get("nir_path")),
+            "red": _Band(red_path, memmap, window, stats.get("red_path")),
+            "swir1": _Band(swir1_path, memmap, window, stats.get("swir1_path")),
+            "swir2": _Band(swir2_path, memmap, window, stats.get("swir2_path")),
+            "tif_file": _Band(tif_file, memmap, window, stats.get("tif_file")),
+        }
 
         self.files_path = [
             blue_path,
@@ -70,16 +462,41 @@ class OpenFiles:
             swir2_path,
         ]
 
-    def get_normalize_bands(self) -> dict[str, np.ndarray]:
-        return {
-            "red": _normalize(self.red_band),
-            "green": _normalize(self.green_band),
-            "blue": _normalize(self.blue_band),
-            "nir": _normalize(self.nir_band),
-            "swir1": _normalize(self.swir1_band),
-            "swir2": _normalize(self.swir2_band),
-            "tif_file": _normalize(self.tif_file),
-        }
+    def get_shape(self, band: str) -> tuple[int, int] | None:
+        """Return (height, width) of a band, reading only the file header."""
+        shape = self._bands[band].shape
+        if shape is None:
+            return None
+        return shape[0], shape[1]
+
+    def read_window(
+        self, band: str, window: Window, normalized: bool = False
+    ) -> np.ndarray | None:
+        """
+        Read one window of a band.
+
+        With ``normalized=True`` the window is scaled with the band's global
+        min/max, so tiles normalize exactly like the whole band would.
+        """
+        _band = self._bands[band]
+        if _band.raster is None:
+            return None
+        if not normalized:
+            return _band.raster[window.slices]
+        dtype = np.dtype(self.normalize_dtype)
+        if dtype in _band._normalized:
+            return _band._normalized[dtype][window.slices]
+        return _normalize(_band.raster[window.slices], dtype, _band.min_max)
+
+    def get_stats(self, band: str) -> dict | None:
+        """Precomputed statistics of a band's file, if they were given."""
+        return self._bands[band].stats
+
+    def get_bands(self) -> dict[str, np.ndarray | None]:
+        return {name: self._bands[name].data for name in BAND_NAMES}
+
+    def get_normalize_bands(self, dtype: np.dtype | None = None) -> Mapping:
+        return _NormalizedBands(self._bands, dtype or self.normalize_dtype)
 
     def get_images_metadata(self) -> dict:
         return {
@@ -92,5 +509,7 @@ class OpenFiles:
             "tif_file": self.tif_file_metadata,
         }
 
-    def get_collection(self) -> any:
-        return io.imread_collection(self.files_path)
+    def get_collection(self) -> list[np.ndarray]:
+        return [
+            self._bands[name].raster for name in BAND_NAMES if self._bands[name].path
+        ]
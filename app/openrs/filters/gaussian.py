@@ -1,45 +1,47 @@
 from pathlib import Path
 
 import cv2
-from matplotlib import pyplot as plt
+import numpy as np
 
 from app.openrs.base import Base
+from app.openrs.export import LUTExport
 from app.openrs.file_handler import OpenFiles
+from app.openrs.tiling import Window
 
 
 class GAUSSIANCalculator(Base):
+    # Radius of the 13x13 kernel
+    tile_halo = 6
+
     def __init__(self, files):
         # Check requirment bands
-        if files.tif_file is None:
+        if files.tif_file_path is None:
             raise Exception("Message")
 
         super().__init__(files)
-        # Normalize the bands
-        self.normalized_bands = files.get_normalize_bands()
-
-        self.image = files.tif_file_metadata["image"]
 
     def calculate(self, extra_params):
-        gaussian = cv2.GaussianBlur(self.image, (13, 13), 0)
+        gaussian = self.calculate_tiled(extra_params, band="tif_file")
         self.gaussian = gaussian
 
         return gaussian
 
+    def calculate_window(self, window: Window, extra_params):
+        image = np.ascontiguousarray(self.files.read_window("tif_file", window))
+        return cv2.GaussianBlur(image, (13, 13), 0)
+
     def export(self, file_path, title):
-        plt.figure(figsize=(10, 10))
-        plt.imshow(self.gaussian, cmap="gray")
-        plt.title(title)
-        plt.axis("off")
-        plt.savefig(file_path)
-        plt.close()
+        LUTExport().save(
+            self.gaussian,
+            title,
+            cmap="gray",
+            use_colorbar=False,
+            file_path=file_path,
+        )
 
 
 if __name__ == "__main__":
     tif_file = Path.cwd() / "app/openrs/data/pan_img.tif"
     calculator = GAUSSIANCalculator(OpenFiles(tif_file=tif_file))
     gaussian_image = calculator.calculate()
-    plt.figure(figsize=(10, 10))
-    plt.imshow(gaussian_image, cmap="gray")
-    plt.title("Guassian Filter")
-    plt.axis("off")
-    plt.show()
+    LUTExport().show(gaussian_image, "Guassian Filter", cmap="gray", use_colorbar=False)
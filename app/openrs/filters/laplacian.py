@@ -1,24 +1,22 @@
 from pathlib import Path
 
 import cv2
+import numpy as np
 from fastapi import HTTPException, status
-from matplotlib import pyplot as plt
 
 from app.openrs.base import Base
+from app.openrs.export import LUTExport
 from app.openrs.file_handler import OpenFiles
+from app.openrs.tiling import Window
 
 
 class LAPLACIANCalculator(Base):
     def __init__(self, files):
         # Check requirment bands
-        if files.tif_file is None:
+        if files.tif_file_path is None:
             raise Exception("Message")
 
         super().__init__(files)
-        # Normalize the bands
-        self.normalized_bands = files.get_normalize_bands()
-
-        self.image = files.tif_file_metadata["image"]
 
     def calculate(self, extra_params: dict) -> any:
         # Validation extra parameters
@@ -45,18 +43,24 @@ class LAPLACIANCalculator(Base):
         # End validation extra parameters
         kernel_size: int = extra_params["kernel_size"]
 
-        # This calculate may need more params for Sobel argument
-        laplacian_image = cv2.Laplacian(self.image, -1, ksize=kernel_size)
+        self.tile_halo = max(kernel_size // 2, 1)
+        laplacian_image = self.calculate_tiled(extra_params, band="tif_file")
         self.laplacian_image = laplacian_image
         return laplacian_image
 
+    def calculate_window(self, window: Window, extra_params: dict):
+        image = np.ascontiguousarray(self.files.read_window("tif_file", window))
+        # This calculate may need more params for Sobel argument
+        return cv2.Laplacian(image, -1, ksize=extra_params["kernel_size"])
+
     def export(self, file_path, title) -> None:
-        plt.figure(figsize=(10, 10))
-        plt.imshow(self.laplacian_image, cmap="gray")
-        plt.title(title)
-        plt.axis("off")
-        plt.savefig(file_path)
-        plt.close()
+        LUTExport().save(
+            self.laplacian_image,
+            title,
+            cmap="gray",
+            use_colorbar=False,
+            file_path=file_path,
+        )
 
 
 # Export (on test mode)
@@ -64,8 +68,6 @@ if __name__ == "__main__":
     tif_file = Path.cwd() / "app/openrs/data/pan_img.tif"
     calculator = LAPLACIANCalculator(OpenFiles(tif_file=tif_file))
     laplacian_image = calculator.calculate({"kernel_size": 7})
-    plt.figure(figsize=(10, 10))
-    plt.imshow(laplacian_image, cmap="gray")
-    plt.title("Laplacian Filter")
-    plt.axis("off")
-    plt.show()
+    LUTExport().show(
+        laplacian_image, "Laplacian Filter", cmap="gray", use_colorbar=False
+    )
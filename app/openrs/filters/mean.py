@@ -1,10 +1,12 @@
 from pathlib import Path
 
 import cv2
-from matplotlib import pyplot as plt
+import numpy as np
 
 from app.openrs.base import Base
+from app.openrs.export import LUTExport
 from app.openrs.file_handler import OpenFiles
+from app.openrs.tiling import Window
 
 
 class MEANCalculator(Base):
@@ -12,28 +14,32 @@ class MEANCalculator(Base):
     MEAN calculator class
     """
 
+    # Radius of the 9x9 kernel
+    tile_halo = 4
+
     def __init__(self, files: OpenFiles):
         # Check requirment bands
-        if files.tif_file is None:
+        if files.tif_file_path is None:
             raise Exception("Message")
         super().__init__(files)
-        # Normalize the bands
-        self.normalized_bands = files.get_normalize_bands()
-
-        self.image = files.tif_file_metadata["image"]
 
     def calculate(self, extra_params: dict):
-        self.mean_image = cv2.blur(self.image, (9, 9))
+        self.mean_image = self.calculate_tiled(extra_params, band="tif_file")
 
         return self.mean_image
 
+    def calculate_window(self, window: Window, extra_params: dict):
+        image = np.ascontiguousarray(self.files.read_window("tif_file", window))
+        return cv2.blur(image, (9, 9))
+
     def export(self, file_path: Path, title: str):
-        plt.figure(figsize=(10, 10))
-        plt.imshow(self.mean_image, cmap="gray")
-        plt.title(title)
-        plt.axis("off")
-        plt.savefig(file_path)
-        plt.close()
+        LUTExport().save(
+            self.mean_image,
+            title,
+            cmap="gray",
+            use_colorbar=False,
+            file_path=file_path,
+        )
 
 
 # Export (on test mode)
@@ -41,8 +47,4 @@ if __name__ == "__main__":
     tif_file = Path.cwd() / "app/openrs/data/pan_img.tif"
     calculator = MEANCalculator(OpenFiles(tif_file=tif_file))
     mean_filter = calculator.calculate(None)
-    plt.figure(figsize=(10, 10))
-    plt.imshow(mean_filter, cmap="gray")
-    plt.title("Mean Filter")
-    plt.axis("off")
-    plt.show()
+    LUTExport().show(mean_filter, "Mean Filter", cmap="gray", use_colorbar=False)
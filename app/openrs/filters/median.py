@@ -1,24 +1,22 @@
 from pathlib import Path
 
 import cv2
+import numpy as np
 from fastapi import HTTPException, status
-from matplotlib import pyplot as plt
 
 from app.openrs.base import Base
+from app.openrs.export import LUTExport
 from app.openrs.file_handler import OpenFiles
+from app.openrs.tiling import Window
 
 
 class MEDIANCalculator(Base):
     def __init__(self, files):
         # Check requirment bands
-        if files.tif_file is None:
+        if files.tif_file_path is None:
             raise Exception("Message")
 
         super().__init__(files)
-        # Normalize the bands
-        self.normalized_bands = files.get_normalize_bands()
-
-        self.image = files.tif_file_metadata["image"]
 
     def calculate(self, extra_params: dict) -> any:
         # Validation extra parameters
@@ -46,17 +44,23 @@ class MEDIANCalculator(Base):
         kernel_size: int = extra_params["kernel_size"]
         if type(kernel_size) is not int or kernel_size / 2 == 0:
             raise Exception("kernel_size variable value is wrong (0<KN and ODD)")
-        median_image = cv2.medianBlur(self.image, kernel_size)
+        self.tile_halo = kernel_size // 2
+        median_image = self.calculate_tiled(extra_params, band="tif_file")
         self.median_image = median_image
         return median_image
 
+    def calculate_window(self, window: Window, extra_params: dict):
+        image = np.ascontiguousarray(self.files.read_window("tif_file", window))
+        return cv2.medianBlur(image, extra_params["kernel_size"])
+
     def export(self, file_path, title) -> None:
-        plt.figure(figsize=(10, 10))
-        plt.imshow(self.median_image, cmap="gray")
-        plt.title(title)
-        plt.axis("off")
-        plt.savefig(file_path)
-        plt.close()
+        LUTExport().save(
+            self.median_image,
+            title,
+            cmap="gray",
+            use_colorbar=False,
+            file_path=file_path,
+        )
 
 
 # Export (on test mode)
@@ -64,8 +68,4 @@ if __name__ == "__main__":
     tif_file = Path.cwd() / "app/openrs/data/pan_img.tif"
     calculator = MEDIANCalculator(OpenFiles(tif_file=tif_file))
     median_image = calculator.calculate({"kernel_size": 5})
-    plt.figure(figsize=(10, 10))
-    plt.imshow(median_image, cmap="gray")
-    plt.title("Median Filter")
-    plt.axis("off")
-    plt.show()
+    LUTExport().show(median_image, "Median Filter", cmap="gray", use_colorbar=False)
@@ -1,24 +1,22 @@
 from pathlib import Path
 
 import cv2
+import numpy as np
 from fastapi import HTTPException, status
-from matplotlib import pyplot as plt
 
 from app.openrs.base import Base
+from app.openrs.export import LUTExport
 from app.openrs.file_handler import OpenFiles
+from app.openrs.tiling import Window
 
 
 class SOBELCalculator(Base):
     def __init__(self, files):
         # Check requirment bands
-        if files.tif_file is None:
+        if files.tif_file_path is None:
             raise Exception("Message")
 
         super().__init__(files)
-        # Normalize the bands
-        self.normalized_bands = files.get_normalize_bands()
-
-        self.image = files.tif_file_metadata["image"]
 
     def calculate(self, extra_params: dict) -> any:
         # Validation extra parameters
@@ -47,19 +45,25 @@ class SOBELCalculator(Base):
         if type(kernel_size) is not int or kernel_size / 2 == 0:
             raise Exception("kernel_size variable value is wrong (0<KN and ODD)")
 
-        # This calculate may need more params for Sobel argument
-        sobel_image = cv2.Sobel(self.image, 0, dx=1, dy=1, ksize=kernel_size)
+        self.tile_halo = max(kernel_size // 2, 1)
+        sobel_image = self.calculate_tiled(extra_params, band="tif_file")
         self.sobel_image = sobel_image
 
         return sobel_image
 
+    def calculate_window(self, window: Window, extra_params: dict):
+        image = np.ascontiguousarray(self.files.read_window("tif_file", window))
+        # This calculate may need more params for Sobel argument
+        return cv2.Sobel(image, 0, dx=1, dy=1, ksize=extra_params["kernel_size"])
+
     def export(self, file_path, title) -> None:
-        plt.figure(figsize=(10, 10))
-        plt.imshow(self.sobel_image, cmap="gray")
-        plt.title(title)
-        plt.axis("off")
-        plt.savefig(file_path)
-        plt.close()
+        LUTExport().save(
+            self.sobel_image,
+            title,
+            cmap="gray",
+            use_colorbar=False,
+            file_path=file_path,
+        )
 
 
 # Export (on test mode)
@@ -67,8 +71,4 @@ if __name__ == "__main__":
     tif_file = Path.cwd() / "app/openrs/data/pan_img.tif"
     calculator = SOBELCalculator(OpenFiles(tif_file=tif_file))
     sobel_image = calculator.calculate({"kernel_size": 5})
-    plt.figure(figsize=(10, 10))
-    plt.imshow(sobel_image, cmap="gray")
-    plt.title("Sobel Filter")
-    plt.axis("off")
-    plt.show()
+    LUTExport().show(sobel_image, "Sobel Filter", cmap="gray", use_colorbar=False)
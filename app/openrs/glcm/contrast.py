@@ -8,7 +8,7 @@ from app.openrs.file_handler import OpenFiles
 
 class CONSTRASTCalculator(Base):
     def __init__(self, files: OpenFiles):
-        if files.nir_band is None:
+        if files.nir_path is None:
             raise Exception("The nir band is require for GLCM")
         super().__init__(files)
 
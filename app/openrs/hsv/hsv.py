@@ -1,11 +1,12 @@
 from pathlib import Path
 
 import numpy as np
-from matplotlib import pyplot as plt
 from skimage.color import rgb2hsv
 
 from app.openrs.base import Base
+from app.openrs.export import LUTExport
 from app.openrs.file_handler import OpenFiles
+from app.openrs.tiling import Window
 
 
 class HSVCalculator(Base):
@@ -15,43 +16,38 @@ class HSVCalculator(Base):
     And remeber to remove the 'return' from calculate method)
     """
 
+    tile_parallel = True
+
     def __init__(self, files: OpenFiles):
         # Check requirment bands
         if (
-            files.nir_band is None
-            or files.green_band is None
-            or files.blue_band is None
+            files.nir_path is None
+            or files.green_path is None
+            or files.blue_path is None
         ):
             raise Exception("NIR G B bands are require for HSV")
         super().__init__(files)
-        # Normalize the bands
-        self.normalized_bands = self.files.get_normalize_bands()
         self.hsv = None
 
     def calculate(self, extra_params: dict):
-        ### is this require you define property class instance of simple variable?
-        self.normalized_nir = self.normalized_bands["nir"]
-        self.normalized_green = self.normalized_bands["green"]
-        self.normalized_blue = self.normalized_bands["blue"]
+        self.hsv = self.calculate_tiled(extra_params, band="nir")
+        return self.hsv
 
-        image_hsv = np.dstack(
-            (self.normalized_nir, self.normalized_green, self.normalized_blue)
-        )
+    def calculate_window(self, window: Window, extra_params: dict):
+        normalized_nir = self.files.read_window("nir", window, normalized=True)
+        normalized_green = self.files.read_window("green", window, normalized=True)
+        normalized_blue = self.files.read_window("blue", window, normalized=True)
 
-        hsv = rgb2hsv(image_hsv)
-        self.hsv = hsv
-        # Remove this return when you complete the export
-        return hsv
+        image_hsv = np.dstack((normalized_nir, normalized_green, normalized_blue))
+
+        return rgb2hsv(image_hsv)
 
     def export(self, file_path: Path, title: str):
-        # complete this section
-        plt.figure(figsize=(20, 10))
-        plt.title(title)
-        plt.imshow(self.hsv)
-        plt.grid(True)
-        plt.colorbar()
-        plt.savefig(file_path)
-        plt.close()
+        LUTExport().save(
+            self.hsv,
+            title,
+            file_path=file_path,
+        )
 
 
 # Export (on test mode)
@@ -64,7 +60,4 @@ if __name__ == "__main__":
         OpenFiles(nir_path=nir_path, green_path=green_path, blue_path=blue_path)
     )
     hsv = calculator.calculate()
-    plt.figure(figsize=(20, 10))
-    plt.imshow(hsv)
-    plt.colorbar()
-    plt.show()
+    LUTExport().show(hsv, "hsv")
@@ -1,11 +1,12 @@
 from pathlib import Path
 
 import numpy as np
-from matplotlib import pyplot as plt
 from skimage.color import rgb2hsv
 
 from app.openrs.base import Base
+from app.openrs.export import LUTExport
 from app.openrs.file_handler import OpenFiles
+from app.openrs.tiling import Window
 
 
 class IRVALUEHSVCalculator(Base):
@@ -13,43 +14,39 @@ class IRVALUEHSVCalculator(Base):
     IRVALUEHSV calculator class
     """
 
+    tile_parallel = True
+
     def __init__(self, files: OpenFiles):
         # Check requirment bands
         if (
-            files.swir2_band is None
-            or files.swir1_band is None
-            or files.red_band is None
+            files.swir2_path is None
+            or files.swir1_path is None
+            or files.red_path is None
         ):
             raise Exception("NIR G B bands are require for HSV")
         super().__init__(files)
-        # Normalize the bands
-        self.normalized_bands = self.files.get_normalize_bands()
         self.irvaluehsv = None
 
     def calculate(self, extra_params: dict):
-        ### is this require you define property class instance of simple variable?
-        self.normalized_swir2 = self.normalized_bands["swir2"]
-        self.normalized_swir1 = self.normalized_bands["swir1"]
-        self.normalized_red = self.normalized_bands["red"]
+        self.irvaluehsv = self.calculate_tiled(extra_params, band="swir2")
+        return self.irvaluehsv
 
-        image_irimg = np.dstack(
-            (self.normalized_swir2, self.normalized_swir1, self.normalized_red)
-        )
+    def calculate_window(self, window: Window, extra_params: dict):
+        normalized_swir2 = self.files.read_window("swir2", window, normalized=True)
+        normalized_swir1 = self.files.read_window("swir1", window, normalized=True)
+        normalized_red = self.files.read_window("red", window, normalized=True)
 
-        irhsv = rgb2hsv(image_irimg)
-        self.irvaluehsv = irhsv[:, :, 2]
-        # Remove this return when you complete the export
-        return self.irvaluehsv
+        image_irimg = np.dstack((normalized_swir2, normalized_swir1, normalized_red))
+
+        return rgb2hsv(image_irimg)[:, :, 2]
 
     def export(self, file_path: Path, title: str):
-        # complete this section
-        plt.figure(figsize=(20, 10))
-        plt.title(title)
-        plt.imshow(self.irvaluehsv)
-        plt.grid(True)
-        plt.colorbar()
-        plt.savefig(file_path)
-        plt.close()
+        LUTExport().save(
+            self.irvaluehsv,
+            title,
+            cmap="viridis",
+            file_path=file_path,
+        )
 
 
 # Export (on test mode)
@@ -65,7 +62,4 @@ if __name__ == "__main__":
         OpenFiles(swir1_path=swir1, swir2_path=swir2, red_path=red)
     )
     irvaluehsv = calculator.calculate()
-    plt.figure(figsize=(20, 10))
-    plt.imshow(irvaluehsv)
-    plt.colorbar()
-    plt.show()
+    LUTExport().show(irvaluehsv, "irvaluehsv", cmap="viridis")
@@ -1,11 +1,11 @@
 from pathlib import Path
 
 from fastapi import HTTPException, status
-from matplotlib import pyplot as plt
 from pydantic import BaseModel, ValidationError, confloat
 from skimage import exposure, img_as_float
 
 from app.openrs.base import Base
+from app.openrs.export import LUTExport
 from app.openrs.file_handler import OpenFiles
 
 
@@ -22,7 +22,7 @@ class AdaptiveImageType(BaseModel):
 
 class ADAPTIVEIMAGECalculator(Base):
     def __init__(self, files: OpenFiles) -> None:
-        if files.nir_band is None:
+        if files.nir_path is None:
             raise HTTPException(
                 detail="NIR band are require to calculate Image enhancement (adaptive image)",
                 status_code=status.HTTP_412_PRECONDITION_FAILED,
@@ -53,23 +53,14 @@ class ADAPTIVEIMAGECalculator(Base):
         return adaptive_image
 
     def export(self, file_path, title):
-        fig, ax = plt.subplots(nrows=1, ncols=2, figsize=(10, 5))
-        ax[0].imshow(self.adaptive_image, cmap="gray")
-        ax[0].set_title(f"Adaptive Image {title}")
-        ax[0].axis("off")
-        ax[1].hist(
-            self.adaptive_image.ravel(),
-            bins=256,
-            density=True,
-            histtype="bar",
-            color="black",
+        LUTExport().save(
+            self.adaptive_image,
+            f"Adaptive Image {title}",
+            cmap="gray",
+            use_colorbar=False,
+            use_histogram=True,
+            file_path=file_path,
         )
-        ax[1].ticklabel_format(style="plain")
-        ax[1].set_title(f"Histogram of Adaptive Image {title}")
-
-        # plt.show()
-        plt.savefig(file_path)
-        plt.close()
 
 
 # This condition is for test output of operation calculator class
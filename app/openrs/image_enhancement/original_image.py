@@ -1,16 +1,15 @@
 from pathlib import Path
 
-import matplotlib.pyplot as plt
-from matplotlib.gridspec import GridSpec
 from skimage import img_as_float
 
 from app.openrs.base import Base
+from app.openrs.export import LUTExport
 from app.openrs.file_handler import OpenFiles
 
 
 class ORGINALIMAGECalculator(Base):
     def __init__(self, files: OpenFiles):
-        if files.nir_band is None:
+        if files.nir_path is None:
             raise Exception("NIR band are require to calculate Image enhancement")
 
         super().__init__(files)
@@ -22,28 +21,14 @@ class ORGINALIMAGECalculator(Base):
         return self.image_float
 
     def export(self, file_path, title):
-        fig = plt.figure(figsize=(10, 5))
-        gs = GridSpec(
-            1, 2, width_ratios=[1, 1], height_ratios=[2]
-        )  # Adjust height ratios if needed
-
-        # Display the original image
-        ax0 = fig.add_subplot(gs[0, 0])
-        ax0.imshow(self.nir_band, cmap="gray")
-        ax0.set_title("Original Image")
-        ax0.axis("off")
-
-        # Histogram of the original image with reduced height
-        ax1 = fig.add_subplot(gs[0, 1])
-        ax1.hist(
-            self.nir_band.ravel(), bins=256, density=True, histtype="bar", color="black"
+        LUTExport().save(
+            self.nir_band,
+            "Original Image",
+            cmap="gray",
+            use_colorbar=False,
+            use_histogram=True,
+            file_path=file_path,
         )
-        ax1.ticklabel_format(style="plain")
-        ax1.set_title("Histogram of Original Image")
-
-        # plt.show()
-        plt.savefig(file_path)
-        plt.close()
 
 
 if __name__ == "__main__":
@@ -2,19 +2,19 @@ from pathlib import Path
 
 import numpy as np
 from fastapi import HTTPException, status
-from matplotlib import pyplot as plt
 from skimage import exposure
 
 from app.openrs.base import Base
+from app.openrs.export import LUTExport
 from app.openrs.file_handler import OpenFiles
 
 
 class RGBEQUALIZEIMAGECalculator(Base):
     def __init__(self, files: OpenFiles) -> None:
         if (
-            files.blue_band is None
-            or files.red_band is None
-            or files.green_band is None
+            files.blue_path is None
+            or files.red_path is None
+            or files.green_path is None
         ):
             raise HTTPException(
                 detail="BLUE/RED/GREEN bands are require to calculate Image enhancement (rgb equalize)",
@@ -31,16 +31,6 @@ class RGBEQUALIZEIMAGECalculator(Base):
         blue_band = np.array(self.blue_band).astype(float)
         green_band = np.array(self.green_band).astype(float)
 
-        blue_band_normalize = (blue_band - np.min(blue_band)) / (
-            np.max(blue_band) - np.min(blue_band)
-        )
-        green_band_normalize = (green_band - np.min(green_band)) / (
-            np.max(green_band) - np.min(green_band)
-        )
-        red_band_normalize = (red_band - np.min(red_band)) / (
-            np.max(red_band) - np.min(red_band)
-        )
-
         blue_band_normalize = exposure.equalize_hist(blue_band, nbins=256, mask=None)
         green_band_normalize = exposure.equalize_hist(green_band, nbins=256, mask=None)
         red_band_normalize = exposure.equalize_hist(red_band, nbins=256, mask=None)
@@ -50,24 +40,17 @@ class RGBEQUALIZEIMAGECalculator(Base):
         )
 
         self.equalizergb_nstack = equalizergb_nstack
+        return equalizergb_nstack
 
     def export(self, file_path, title):
-        fig, ax = plt.subplots(nrows=1, ncols=2, figsize=(10, 5))
-        ax[0].imshow(self.equalizergb_nstack, cmap="gray")
-        ax[0].set_title(f"Equalize RGB {title}")
-        ax[0].axis("off")
-        ax[1].hist(
-            self.equalizergb_nstack.ravel(),
-            bins=256,
-            density=True,
-            histtype="bar",
-            color="black",
+        LUTExport().save(
+            self.equalizergb_nstack,
+            f"Equalize RGB {title}",
+            cmap="gray",
+            use_colorbar=False,
+            use_histogram=True,
+            file_path=file_path,
         )
-        ax[1].ticklabel_format(style="plain")
-        ax[1].set_title(f"Histogram of Equalize RGB {title}")
-        # plt.show()
-        plt.savefig(file_path)
-        plt.close()
 
 
 # This condition is for test output of operation calculator class
@@ -1,23 +1,25 @@
 from pathlib import Path
 
 from fastapi import HTTPException, status
-from matplotlib import pyplot as plt
 from skimage import exposure, img_as_float
 
 from app.openrs.base import Base
+from app.openrs.export import LUTExport
 from app.openrs.file_handler import OpenFiles
+from app.openrs.tiling import Window
 
 
 class SIGMODIDADJUSTCalculator(Base):
+    tile_parallel = True
+
     def __init__(self, files: OpenFiles) -> None:
-        if files.nir_band is None:
+        if files.nir_path is None:
             raise HTTPException(
                 detail="NIR band are require to calculate Image enhancement (log adjust)",
                 status_code=status.HTTP_412_PRECONDITION_FAILED,
             )
 
         super().__init__(files)
-        self.nir_band = self.files.nir_metadata["skimage"]
 
     def calculate(self, extra_params):
         # Validation extra parameters
@@ -47,35 +49,28 @@ class SIGMODIDADJUSTCalculator(Base):
             )
         # End validation extra parameters
 
+        sigmoid_adjust = self.calculate_tiled(extra_params, band="nir")
+        self.sigmoid_adjust = sigmoid_adjust
+
+        return sigmoid_adjust
+
+    def calculate_window(self, window: Window, extra_params):
         gain = extra_params["gain"]
         inv = extra_params["inv"]
         cutoff = extra_params["cutoff"]
 
-        float_image = img_as_float(self.nir_band)
-        sigmoid_adjust = exposure.adjust_sigmoid(
-            float_image, cutoff=cutoff, gain=gain, inv=inv
-        )
-        self.sigmoid_adjust = sigmoid_adjust
-
-        return sigmoid_adjust
+        float_image = img_as_float(self.files.read_window("nir", window))
+        return exposure.adjust_sigmoid(float_image, cutoff=cutoff, gain=gain, inv=inv)
 
     def export(self, file_path, title):
-        fig, ax = plt.subplots(nrows=1, ncols=2, figsize=(10, 5))
-        ax[0].imshow(self.sigmoid_adjust, cmap="gray")
-        ax[0].set_title(f"Log Adjust {title}")
-        ax[0].axis("off")
-        ax[1].hist(
-            self.sigmoid_adjust.ravel(),
-            bins=256,
-            density=True,
-            histtype="bar",
-            color="black",
+        LUTExport().save(
+            self.sigmoid_adjust,
+            f"Log Adjust {title}",
+            cmap="gray",
+            use_colorbar=False,
+            use_histogram=True,
+            file_path=file_path,
         )
-        ax[1].ticklabel_format(style="plain")
-        ax[1].set_title(f"Histogram of Log Adjust {title}")
-        # plt.show()
-        plt.savefig(file_path)
-        plt.close()
 
 
 # This condition is for test output of operation calculator class
@@ -1,7 +1,5 @@
 from pathlib import Path
 
-import matplotlib.pyplot as plt
-
 # from skimage import io
 from fastapi import HTTPException, status
 
@@ -9,6 +7,7 @@ from fastapi import HTTPException, status
 from sklearn.cluster import KMeans
 
 from app.openrs.base import Base
+from app.openrs.export import LUTExport
 from app.openrs.file_handler import OpenFiles
 
 
@@ -21,11 +20,9 @@ class KMEANSCalculator(Base):
 
     def __init__(self, files: OpenFiles):
         # Check requirment bands
-        if files.nir_band is None:
+        if files.nir_path is None:
             raise Exception("NIR band is require for Kmeans")
         super().__init__(files)
-        # Normalize the bands
-        self.normalized_bands = self.files.get_normalize_bands()
         self.nir_band_metadata = self.files.nir_metadata
         self.nir = self.files.nir_band
         self.kmeans = None
@@ -92,13 +89,13 @@ class KMEANSCalculator(Base):
         return self.kmeans
 
     def export(self, file_path, title) -> any:
-        plt.figure(figsize=(15, 15))
-        plt.title(title)
-        plt.imshow(self.kmeans)
-        plt.axis("off")
-        plt.savefig(file_path)
-        # plt.show()
-        plt.close()
+        LUTExport().save(
+            self.kmeans,
+            title,
+            cmap="viridis",
+            use_colorbar=False,
+            file_path=file_path,
+        )
 
 
 if __name__ == "__main__":
@@ -121,7 +118,4 @@ if __name__ == "__main__":
     )
     kmeans = calculator.calculate(4, 0)
 
-    plt.figure(figsize=(15, 15))
-    plt.imshow(kmeans)
-    plt.axis("off")
-    plt.show()
+    LUTExport().show(kmeans, "kmeans", cmap="viridis", use_colorbar=False)
@@ -14,7 +14,8 @@ class PCACalculator(Base):
     def __init__(self, files: OpenFiles):
         super().__init__(files)
         self.pcas = None  # Initialize as None until calculated
-        self.image_shape = (files.red_metadata["width"], files.red_metadata["height"])
+        height, width = files.get_shape("red")
+        self.image_shape = (width, height)
 
     def calculate(self, extra_params: dict):
         imgcol_filtered = self.files.get_collection()
@@ -27,6 +28,13 @@ class PCACalculator(Base):
         self.pcas = pca.components_[:6]  # Store the first 6 components
         return self.pcas
 
+    def raster(self, result) -> np.ndarray | None:
+        # One image per component, components last like a multi-band raster
+        height, width = self.files.get_shape("red")
+        return np.stack(
+            [component.reshape(height, width) for component in self.pcas], axis=-1
+        )
+
     def export(self, file_path: Path, title: str):
         if self.pcas is None:
             raise OException("PCA has not been calculated. Call 'calculate' first.")
@@ -1,42 +1,44 @@
 from pathlib import Path
 
-from matplotlib import pyplot as plt
-
 from app.openrs.base import Base
 from app.openrs.exceptions.OException import OException
-from app.openrs.export import PlotExport
+from app.openrs.export import LUTExport
 from app.openrs.file_handler import OpenFiles
+from app.openrs.tiling import Window
 
 
 class AFVICalculator(Base):
     """A class to calculate the Normalized Difference Vegetation Index (NDVI)."""
 
+    tile_parallel = True
+
     def __init__(self, files: OpenFiles):
-        if files.swir1_band is None or files.nir_band is None:
+        if files.swir1_path is None or files.nir_path is None:
             raise Exception("Both NIR and Swir1 bands are required")
         super().__init__(files)
-        self.normalized_bands = self.files.get_normalize_bands()
         self.afvi = None
 
     def calculate(self, extra_params: dict):
-        normalized_swir1 = self.normalized_bands["swir1"]
-        normalized_nir = self.normalized_bands["nir"]
-        self.afvi = (normalized_nir - 0.66) * (
+        self.afvi = self.calculate_tiled(extra_params, band="nir")
+        return self.afvi
+
+    def calculate_window(self, window: Window, extra_params: dict):
+        normalized_swir1 = self.files.read_window("swir1", window, normalized=True)
+        normalized_nir = self.files.read_window("nir", window, normalized=True)
+        return (normalized_nir - 0.66) * (
             normalized_swir1 / (normalized_nir + (0.66 * normalized_swir1))
         )
-        return self.afvi
 
     def export(self, file_path: Path, title: str):
         if self.afvi is None:
             raise OException("NDWI has not been calculated. Call 'calculate' first.")
 
-        plt.figure(figsize=(15, 10))
-        plt.imshow(self.afvi, cmap="gray")
-        plt.title(title)
-        plt.colorbar()
-        plt.axis("off")
-        plt.savefig(file_path)
-        plt.close()
+        LUTExport().save(
+            self.afvi,
+            title,
+            cmap="gray",
+            file_path=file_path,
+        )
 
 
 if __name__ == "__main__":
@@ -45,5 +47,4 @@ if __name__ == "__main__":
 
     calculator = AFVICalculator(OpenFiles(swir1_path=swir1_path, nir_path=nir_path))
     ndvi = calculator.calculate()
-    plot_export = PlotExport()
     calculator.export("hello", "world")
@@ -1,43 +1,45 @@
 from pathlib import Path
 
-from matplotlib import pyplot as plt
-
 from app.openrs.base import Base
 from app.openrs.exceptions.OException import OException
-from app.openrs.export import PlotExport
+from app.openrs.export import LUTExport
 from app.openrs.file_handler import OpenFiles
+from app.openrs.tiling import Window
 
 
 class BICalculator(Base):
     """A class to calculate the Normalized Difference Vegetation Index (NDVI)."""
 
+    tile_parallel = True
+
     def __init__(self, files: OpenFiles):
-        if files.red_band is None or files.nir_band is None or files.green_band is None:
+        if files.red_path is None or files.nir_path is None or files.green_path is None:
             raise Exception("NIR and Green and Red bands are required")
         super().__init__(files)
-        self.normalized_bands = self.files.get_normalize_bands()
         self.bi = None
 
     def calculate(self, extra_params: dict):
-        normalized_green = self.normalized_bands["green"]
-        normalized_nir = self.normalized_bands["nir"]
-        normalized_red = self.normalized_bands["red"]
-        self.bi = ((normalized_nir - normalized_green) - normalized_red) / (
+        self.bi = self.calculate_tiled(extra_params, band="nir")
+        return self.bi
+
+    def calculate_window(self, window: Window, extra_params: dict):
+        normalized_green = self.files.read_window("green", window, normalized=True)
+        normalized_nir = self.files.read_window("nir", window, normalized=True)
+        normalized_red = self.files.read_window("red", window, normalized=True)
+        return ((normalized_nir - normalized_green) - normalized_red) / (
             (normalized_nir + normalized_green) + normalized_red
         )
-        return self.bi
 
     def export(self, file_path: Path, title: str):
         if self.bi is None:
             raise OException("BI has not been calculated. Call 'calculate' first.")
 
-        plt.figure(figsize=(15, 10))
-        plt.imshow(self.bi, cmap="gray")
-        plt.title(title)
-        plt.colorbar()
-        plt.axis("off")
-        plt.savefig(file_path)
-        plt.close()
+        LUTExport().save(
+            self.bi,
+            title,
+            cmap="gray",
+            file_path=file_path,
+        )
 
 
 if __name__ == "__main__":
@@ -49,5 +51,4 @@ if __name__ == "__main__":
         OpenFiles(green_path=green_path, nir_path=nir_path, red_path=red_path)
     )
     ndvi = calculator.calculate()
-    plot_export = PlotExport()
     calculator.export("hello", "world")
@@ -1,43 +1,42 @@
 from pathlib import Path
 
-from matplotlib import pyplot as plt
-
 from app.openrs.base import Base
 from app.openrs.exceptions.OException import OException
-from app.openrs.export import PlotExport
+from app.openrs.export import LUTExport
 from app.openrs.file_handler import OpenFiles
+from app.openrs.tiling import Window
 
 
 class NDVICalculator(Base):
     """A class to calculate the Normalized Difference Vegetation Index (NDVI)."""
 
+    tile_parallel = True
+
     def __init__(self, files: OpenFiles):
-        if files.red_band is None or files.nir_band is None:
+        if files.red_path is None or files.nir_path is None:
             raise Exception("Both NIR and Red bands are required")
         super().__init__(files)
-        self.normalized_bands = self.files.get_normalize_bands()
         self.ndvi = None
 
     def calculate(self, extra_params: dict):
-        self.normalized_red = self.normalized_bands["red"]
-        self.normalized_nir = self.normalized_bands["nir"]
-        self.ndvi = (self.normalized_nir - self.normalized_red) / (
-            self.normalized_nir + self.normalized_red
-        )
+        self.ndvi = self.calculate_tiled(extra_params, band="nir")
         return self.ndvi
 
+    def calculate_window(self, window: Window, extra_params: dict):
+        normalized_red = self.files.read_window("red", window, normalized=True)
+        normalized_nir = self.files.read_window("nir", window, normalized=True)
+        return (normalized_nir - normalized_red) / (normalized_nir + normalized_red)
+
     def export(self, file_path: Path, title: str):
         if self.ndvi is None:
             raise OException("NDVI has not been calculated. Call 'calculate' first.")
 
-        plt.figure(figsize=(15, 10))
-        plt.imshow(self.ndvi, cmap="gray")
-        plt.title(title)
-        plt.colorbar()
-        plt.axis("off")
-        plt.savefig(file_path)
-        plt.show()
-        plt.close()
+        LUTExport().save(
+            self.ndvi,
+            title,
+            cmap="gray",
+            file_path=file_path,
+        )
 
 
 if __name__ == "__main__":
@@ -46,5 +45,4 @@ if __name__ == "__main__":
 
     calculator = NDVICalculator(OpenFiles(red_path=red_path, nir_path=nir_path))
     ndvi = calculator.calculate()
-    plot_export = PlotExport()
     calculator.export(file_path="./", title="NDVI Image")
@@ -1,42 +1,42 @@
 from pathlib import Path
 
-from matplotlib import pyplot as plt
-
 from app.openrs.base import Base
 from app.openrs.exceptions.OException import OException
-from app.openrs.export import PlotExport
+from app.openrs.export import LUTExport
 from app.openrs.file_handler import OpenFiles
+from app.openrs.tiling import Window
 
 
 class UICalculator(Base):
     """A class to calculate the Normalized Difference Vegetation Index (NDVI)."""
 
+    tile_parallel = True
+
     def __init__(self, files: OpenFiles):
-        if files.swir2_band is None or files.nir_band is None:
+        if files.swir2_path is None or files.nir_path is None:
             raise Exception("Both NIR and Swir2 bands are required")
         super().__init__(files)
-        self.normalized_bands = self.files.get_normalize_bands()
         self.ui = None
 
     def calculate(self, extra_params: dict):
-        normalized_swir2 = self.normalized_bands["swir2"]
-        normalized_nir = self.normalized_bands["nir"]
-        self.ui = (normalized_swir2 - normalized_nir) / (
-            normalized_nir + normalized_swir2
-        )
+        self.ui = self.calculate_tiled(extra_params, band="nir")
         return self.ui
 
+    def calculate_window(self, window: Window, extra_params: dict):
+        normalized_swir2 = self.files.read_window("swir2", window, normalized=True)
+        normalized_nir = self.files.read_window("nir", window, normalized=True)
+        return (normalized_swir2 - normalized_nir) / (normalized_nir + normalized_swir2)
+
     def export(self, file_path: Path, title: str):
         if self.ui is None:
             raise OException("UI has not been calculated. Call 'calculate' first.")
 
-        plt.figure(figsize=(15, 10))
-        plt.imshow(self.ui, cmap="gray")
-        plt.title(title)
-        plt.colorbar()
-        plt.axis("off")
-        plt.savefig(file_path)
-        plt.close()
+        LUTExport().save(
+            self.ui,
+            title,
+            cmap="gray",
+            file_path=file_path,
+        )
 
 
 if __name__ == "__main__":
@@ -45,5 +45,4 @@ if __name__ == "__main__":
 
     calculator = UICalculator(OpenFiles(swir2_path=swir2, nir_path=nir_path))
     ndvi = calculator.calculate()
-    plot_export = PlotExport()
     calculator.export("hello", "world")
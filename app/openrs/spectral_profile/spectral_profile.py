@@ -2,10 +2,21 @@ from pathlib import Path
 
 import matplotlib.pyplot as plt
 import numpy as np
-from skimage import exposure
+from fastapi import HTTPException, status
+from skimage.draw import polygon2mask
 
 from app.openrs.base import Base
-from app.openrs.file_handler import OpenFiles
+from app.openrs.file_handler import (
+    BAND_NAMES,
+    OpenFiles,
+    _valid_pixels,
+    read_nodata,
+)
+from app.openrs.tiling import Window, iter_windows
+
+
+def _invalid(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail=detail)
 
 
 class SpectralProfile(Base):
@@ -15,42 +26,121 @@ class SpectralProfile(Base):
 
         :param files: An instance of OpenFiles containing image data.
         """
+        if all(path is None for path in files.files_path):
+            raise _invalid(
+                "At least one band is required to calculate spectral profile"
+            )
         super().__init__(files)
         self.files = files
-        self.img = None
         self.xaxis = []
         self.yaxis = []
+        # Profile label -> one value per band
+        self.profiles: dict[str, list[float]] = {}
+
+    @classmethod
+    def reads_pixels(cls, extra_params: dict | None) -> bool:
+        extra_params = extra_params or {}
+        return bool(extra_params.get("polygon") or extra_params.get("points"))
 
     def calculate(self, extra_params: dict):
         """
-        Calculate the spectral profile by adjusting the logarithmic scale
-        of a specific image band and preparing data for plotting.
+        Calculate the spectral profile: one value per given band.
+
+        By default the profile is the mean of each band, taken from the
+        band statistics when they were precomputed and otherwise streamed
+        tile by tile. ``extra_params`` may instead give a ``polygon`` (the
+        mean inside it) or ``points`` (one profile per pixel), as [x, y]
+        pixel coordinates; only the pixels they cover are read.
         """
-        # # Extract image collections from the files
-        imgcol = self.files.__dict__
-        imgcol_filtered = []
+        extra_params = extra_params or {}
+        self.profiles = {}
+        bands = [name for name in BAND_NAMES if getattr(self.files, f"{name}_path")]
+        self.xaxis = [f"Band{BAND_NAMES.index(name) + 1}" for name in bands]
+
+        if points := extra_params.get("points"):
+            for x, y in self._coordinates(points, "points"):
+                self.profiles[f"Pixel ({x}, {y})"] = [
+                    self._point_value(name, x, y) for name in bands
+                ]
+        elif polygon := extra_params.get("polygon"):
+            window, mask = self._polygon_mask(
+                self._coordinates(polygon, "polygon"), bands[0]
+            )
+            self.profiles["Polygon mean"] = [
+                float(self.files.read_window(name, window)[mask].mean(dtype=float))
+                for name in bands
+            ]
+        else:
+            self.profiles["Mean"] = [self._mean(name) for name in bands]
 
-        for key, value in imgcol.items():  # Iterate over both keys and values
-            if "band" in key:  # Check if "band" is in the attribute name (key)
-                imgcol_filtered.append(value)  # Append the actual value
+        self.yaxis = next(iter(self.profiles.values()))
+        return self.profiles
 
-        # Ensure imgcol[4] is within bounds and valid
-        if len(imgcol_filtered) > 4 and isinstance(imgcol_filtered[4], np.ndarray):
-            self.img = exposure.adjust_log(imgcol_filtered[4])
+    @staticmethod
+    def _coordinates(values, name: str) -> list[tuple[int, int]]:
+        try:
+            coordinates = [(int(x), int(y)) for x, y in values]
+        except (TypeError, ValueError):
+            raise _invalid(f"{name} should be a list of [x, y] pixel coordinates")
+        if not coordinates:
+            raise _invalid(f"{name} should not be empty")
+        return coordinates
+
+    def _mean(self, band: str) -> float:
+        stats = self.files.get_stats(band)
+        if stats and stats.get("mean") is not None and self.files.window is None:
+            return stats["mean"]
+
+        # Left out like in the stored statistics
+        if stats and "nodata" in stats:
+            nodata = stats["nodata"]
         else:
-            raise ValueError("Invalid image data at index 4.")
+            nodata = read_nodata(getattr(self.files, f"{band}_path"))
+        height, width = self.files.get_shape(band)
+        total, count = 0.0, 0
+        for window in iter_windows(height, width, self.tile_size):
+            tile = _valid_pixels(self.files.read_window(band, window), nodata)
+            total += float(tile.sum(dtype=np.float64))
+            count += tile.size
+        if not count:
+            raise _invalid(f"Band {band} has no valid pixels")
+        return total / count
+
+    def _point_value(self, band: str, x: int, y: int) -> float:
+        height, width = self.files.get_shape(band)
+        if not (0 <= x < width and 0 <= y < height):
+            raise _invalid(f"Point ({x}, {y}) is outside the {width}x{height} scene")
+        return float(self.files.read_window(band, Window(y, x, 1, 1))[0, 0])
 
-        # Prepare x and y axis data for plotting
-        for i, img in enumerate(imgcol_filtered):
-            self.xaxis.append(f"Band{i + 1}")
-            self.yaxis.append(np.mean(img))
+    def _polygon_mask(
+        self, vertices: list[tuple[int, int]], band: str
+    ) -> tuple[Window, np.ndarray]:
+        """Bounding window of a polygon and the mask of its pixels in it."""
+        height, width = self.files.get_shape(band)
+        xs, ys = zip(*vertices)
+        window = Window(
+            min(ys), min(xs), max(ys) - min(ys) + 1, max(xs) - min(xs) + 1
+        ).clip(height, width)
+        if window is None:
+            raise _invalid("The polygon does not overlap the scene")
+
+        mask = polygon2mask(
+            (window.height, window.width),
+            [(y - window.row, x - window.col) for x, y in vertices],
+        )
+        if not mask.any():
+            raise _invalid("The polygon does not cover any pixel")
+        return window, mask
 
     def export(self, file_path: Path, title: str):
         """
         Export the calculated spectral profile as a plot.
         """
         plt.figure(figsize=(15, 10))
-        plt.plot(self.xaxis, self.yaxis)
+        for label, values in self.profiles.items():
+            plt.plot(self.xaxis, values, label=label)
+        if len(self.profiles) > 1:
+            plt.legend()
         plt.title(title)
         plt.xlabel("Bands")
         plt.ylabel("Intensity")
@@ -77,5 +167,5 @@ if __name__ == "__main__":
             swir2_path=swir2,
         )
     )
-    ndvi = calculator.calculate()
+    ndvi = calculator.calculate(None)
     calculator.export("spectral_profile", "export")
@@ -18,9 +18,9 @@ from app.openrs.file_handler import OpenFiles
 class SVMCalculator(Base):
     def __init__(self, files: OpenFiles):
         if (
-            files.red_band is None
-            or files.green_band is None
-            or files.blue_band is None
+            files.red_path is None
+            or files.green_path is None
+            or files.blue_path is None
         ):
             raise Exception("RGB band are require to calculate SVM")
         super().__init__(files)
@@ -0,0 +1,151 @@
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, NamedTuple, TypeVar
+
+import numpy as np
+
+DEFAULT_TILE_SIZE = 2048
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class Window(NamedTuple):
+    row: int
+    col: int
+    height: int
+    width: int
+
+    @property
+    def slices(self) -> tuple[slice, slice]:
+        return (
+            slice(self.row, self.row + self.height),
+            slice(self.col, self.col + self.width),
+        )
+
+    def expand(
+        self, halo: int, height: int, width: int
+    ) -> tuple["Window", tuple[slice, slice]]:
+        """
+        Grow the window by ``halo`` pixels on every side, clipped to the scene.
+
+        Returns the grown window and the slices that select the original
+        window inside it. At the scene border nothing is added, so
+        neighborhood operations apply their own border handling exactly as
+        they would on the whole scene.
+        """
+        top = max(self.row - halo, 0)
+        left = max(self.col - halo, 0)
+        bottom = min(self.row + self.height + halo, height)
+        right = min(self.col + self.width + halo, width)
+        expanded = Window(top, left, bottom - top, right - left)
+        inner = (
+            slice(self.row - top, self.row - top + self.height),
+            slice(self.col - left, self.col - left + self.width),
+        )
+        return expanded, inner
+
+    def clip(self, height: int, width: int) -> "Window | None":
+        """Intersect the window with a height x width scene; None if empty."""
+        top, left = max(self.row, 0), max(self.col, 0)
+        bottom = min(self.row + self.height, height)
+        right = min(self.col + self.width, width)
+        if bottom <= top or right <= left:
+            return None
+        return Window(top, left, bottom - top, right - left)
+
+
+def iter_windows(
+    height: int, width: int, tile_size: int = DEFAULT_TILE_SIZE
+) -> Iterator[Window]:
+    """Yield row-major, non-overlapping windows covering a height x width scene."""
+    for row in range(0, height, tile_size):
+        for col in range(0, width, tile_size):
+            yield Window(
+                row,
+                col,
+                min(tile_size, height - row),
+                min(tile_size, width - col),
+            )
+
+
+def create_output(
+    shape: tuple[int, ...], dtype: np.dtype, path: Path | None = None
+) -> np.ndarray:
+    """
+    Allocate the array tiles are written into.
+
+    With a ``path`` the array is a ``.npy`` file mapped into memory, so
+    finished tiles are written out incrementally and can be paged out
+    instead of being held in RAM.
+    """
+    if path is None:
+        return np.empty(shape, dtype=dtype)
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    return np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape)
+
+
+class ThreadBudget:
+    """
+    Process-wide cap on the threads calculators use to compute tiles.
+
+    An operation asks for as many threads as it would like and gets what is
+    left, so a single request can use every core on an idle box while
+    concurrent requests share the cap instead of oversubscribing the CPU.
+    """
+
+    def __init__(self, limit: int):
+        self._lock = threading.Lock()
+        self._limit = limit
+        self._available = limit
+
+    def resize(self, limit: int) -> None:
+        with self._lock:
+            self._available += limit - self._limit
+            self._limit = limit
+
+    def acquire(self, wanted: int) -> int:
+        with self._lock:
+            granted = max(min(wanted, self._available), 0)
+            self._available -= granted
+            return granted
+
+    def release(self, granted: int) -> None:
+        with self._lock:
+            self._available += granted
+
+
+tile_budget = ThreadBudget(os.cpu_count() or 1)
+
+
+def map_windows(
+    func: Callable[[T], R], items: Iterable[T], workers: int = 1
+) -> Iterator[R]:
+    """
+    Yield ``func(item)`` for every item, in order.
+
+    With more than one worker the calls run on a thread pool borrowed from
+    ``tile_budget``; NumPy, OpenCV and skimage release the GIL in their
+    kernels, so pixel-wise tiles scale across cores. At most two tiles per
+    worker are in flight, which keeps memory bounded by the tile size.
+    """
+    granted = tile_budget.acquire(workers) if workers > 1 else 0
+    try:
+        if granted <= 1:
+            for item in items:
+                yield func(item)
+            return
+
+        with ThreadPoolExecutor(max_workers=granted) as pool:
+            pending = deque()
+            for item in items:
+                pending.append(pool.submit(func, item))
+                if len(pending) >= 2 * granted:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+    finally:
+        tile_budget.release(granted)
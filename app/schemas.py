@@ -1,8 +1,9 @@
+import enum
 from datetime import datetime
 
 from email_validator import validate_email
 from fastapi import Form, UploadFile
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 from pydantic import EmailStr as PydanticEmailStr
 
 
@@ -85,6 +86,12 @@ class FileSchema(BaseModel):
     extension: str
 
 
+class UploadSessionCreate(BaseModel):
+    filename: str = Field(max_length=100)
+    extension: str = Field(max_length=10)
+    size: int = Field(gt=0)
+
+
 class BandsNamesRequestForm:
     def __init__(
         self,
@@ -114,6 +121,40 @@ class Bands(BaseModel):
     swir2_band: int | None = None
 
 
+class OutputFormat(str, enum.Enum):
+    # Rendered image
+    png = "png"
+    # Raw result values
+    tiff = "tiff"
+    npy = "npy"
+
+
+class PixelWindow(BaseModel):
+    row: int = Field(ge=0)
+    col: int = Field(ge=0)
+    height: int = Field(gt=0)
+    width: int = Field(gt=0)
+
+
+class BoundingBox(BaseModel):
+    # In the coordinate system of the (georeferenced) bands
+    min_x: float
+    min_y: float
+    max_x: float
+    max_y: float
+
+
+class RegionOfInterest(BaseModel):
+    window: PixelWindow | None = None
+    bbox: BoundingBox | None = None
+
+    @model_validator(mode="after")
+    def check_one_region(self):
+        if (self.window is None) == (self.bbox is None):
+            raise ValueError("Set exactly one of window or bbox")
+        return self
+
+
 class BandsTest(BaseModel):
     red_band: int = Form()
     green_band: int = Form()
@@ -0,0 +1,108 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi import HTTPException, status
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_pool: ProcessPoolExecutor | None = None
+
+
+class RemoteHTTPException(Exception):
+    """
+    Picklable stand-in for an HTTPException raised inside a compute worker.
+
+    HTTPException cannot be unpickled, so workers raise this instead and
+    ``run`` turns it back into an HTTPException in the calling process.
+    """
+
+    def __init__(self, status_code: int, detail):
+        super().__init__(status_code, detail)
+
+
+def _warm_up() -> None:
+    # Import the calculator stack and touch each heavy library once, so the
+    # first request served by this worker does not pay for it.
+    import cv2
+    import matplotlib
+    import numpy as np
+
+    matplotlib.use("Agg")
+    from matplotlib import pyplot as plt
+    from skimage import exposure
+    from sklearn.cluster import KMeans
+
+    import app.services.operation  # noqa: F401 registers every calculator
+    from app.openrs.export import LUTExport
+
+    image = np.zeros((16, 16), dtype=np.uint8)
+    cv2.GaussianBlur(image, (3, 3), 0)
+    exposure.equalize_adapthist(image.astype(float), clip_limit=0.01)
+    KMeans(n_clusters=1, n_init=1).fit(image.reshape(-1, 1))
+    for cmap in ("gray", "viridis"):
+        LUTExport().render(image, "warm-up", cmap=cmap, use_histogram=True)
+    plt.figure()
+    plt.close()
+
+
+def worker_count() -> int:
+    return settings.compute_workers or os.cpu_count() or 1
+
+
+def get_compute_pool() -> ProcessPoolExecutor:
+    """
+    Return the process-wide pool that runs calculators.
+
+    Workers are started with the calculator stack already imported and are
+    recycled after ``compute_max_tasks_per_child`` operations to bound
+    memory fragmentation from large scenes.
+    """
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=worker_count(),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_up,
+                max_tasks_per_child=settings.compute_max_tasks_per_child,
+            )
+        return _pool
+
+
+def _replace_broken_pool(pool: ProcessPoolExecutor) -> None:
+    # Only the first caller that saw this pool break replaces it
+    global _pool
+    with _lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run(func, *args, **kwargs):
+    """
+    Run ``func`` in the compute pool and wait for its result.
+
+    A worker that dies (e.g. killed for running out of memory) breaks the
+    whole pool; it is then replaced and the call retried once, and a second
+    failure is reported as 503 instead of failing every later operation.
+    """
+    for attempt in range(2):
+        pool = get_compute_pool()
+        try:
+            return pool.submit(func, *args, **kwargs).result()
+        except RemoteHTTPException as e:
+            raise HTTPException(status_code=e.args[0], detail=e.args[1])
+        except BrokenProcessPool:
+            logger.exception("Compute pool broke, replacing it")
+            _replace_broken_pool(pool)
+    raise HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="The operation stopped its compute worker, try again later",
+    )
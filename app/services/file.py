@@ -1,10 +1,14 @@
+import hashlib
+import logging
 import os.path
 import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import BinaryIO
+from typing import BinaryIO, Callable, TypeVar
 
-import boto3
-from botocore.exceptions import BotoCoreError, NoCredentialsError
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import BotoCoreError, ClientError, NoCredentialsError
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
@@ -12,25 +16,29 @@ from app.config import settings
 from app.crud.file import FileCrud
 from app.crud.operation import OperationCrud
 from app.crud.saved_location import SavedLocationCrud
-from app.models import File, OperationOutput, Project
-from app.utils import convertor
+from app.models import File, OperationOutput, Project, UploadSession, User, UserRole
+from app.openrs.file_handler import raster_stats, read_nodata
+from app.utils import pyramid
+from app.utils.caching_files.object_cache import object_cache
+from app.utils.caching_files.pyramid_cache import pyramid_cache
+from app.utils.s3 import get_client
 
+logger = logging.getLogger(__name__)
 
-def _save_file(file_path: Path, file_content: BinaryIO):
-    file_content.seek(0)
-    with open(file_path, "wb") as f:
-        f.write(file_content.read())
-    file_content.seek(0)
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+def max_file_size(user: User) -> int:
+    """Largest file a user may upload in one request."""
+    if user.role == UserRole.premium:
+        return settings.max_size_file_premium
+    return settings.max_size_file
 
 
 def _upload_to_s3(location, file: BinaryIO, unique_name: str, extension: str):
     try:
-        s3 = boto3.client(
-            "s3",
-            endpoint_url=location.endpoint,
-            aws_access_key_id=location.access_key,
-            aws_secret_access_key=location.secret_key,
-        )
+        s3 = get_client(location)
         s3.upload_fileobj(file, location.bucket_name, f"{unique_name}.{extension}")
     except NoCredentialsError:
         raise HTTPException(
@@ -44,6 +52,133 @@ def _upload_to_s3(location, file: BinaryIO, unique_name: str, extension: str):
         )
 
 
+def _stream_to_disk_and_s3(
+    location, source: BinaryIO, file_path: Path, key: str
+) -> str:
+    """
+    Copy an upload to ``file_path`` and to object storage in one pass.
+
+    The source is read in ``upload_chunk_size`` chunks; each chunk is hashed,
+    written to disk and sent as a part of an S3 multipart upload on a small
+    thread pool, so disk and network I/O overlap. At most
+    ``upload_concurrency`` parts are in flight, which bounds memory per
+    upload regardless of the file size. Returns the SHA-256 of the content.
+    """
+    s3 = get_client(location)
+    digest = hashlib.sha256()
+    upload_id = None
+    try:
+        response = s3.create_multipart_upload(Bucket=location.bucket_name, Key=key)
+        upload_id = response["UploadId"]
+
+        def upload_part(part_number: int, chunk: bytes) -> dict:
+            response = s3.upload_part(
+                Bucket=location.bucket_name,
+                Key=key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=chunk,
+            )
+            return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+        parts = []
+        source.seek(0)
+        with (
+            open(file_path, "wb") as f,
+            ThreadPoolExecutor(max_workers=settings.upload_concurrency) as pool,
+        ):
+            pending = deque()
+            part_number = 1
+            while chunk := source.read(settings.upload_chunk_size):
+                digest.update(chunk)
+                pending.append(pool.submit(upload_part, part_number, chunk))
+                f.write(chunk)
+                part_number += 1
+                if len(pending) >= settings.upload_concurrency:
+                    parts.append(pending.popleft().result())
+            parts.extend(future.result() for future in pending)
+
+        if not parts:
+            # Multipart uploads need at least one part
+            parts.append(upload_part(1, b""))
+        s3.complete_multipart_upload(
+            Bucket=location.bucket_name,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": parts},
+        )
+    except NoCredentialsError:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to upload file due to missing credentials",
+        )
+    except (BotoCoreError, ClientError) as e:
+        if upload_id is not None:
+            s3.abort_multipart_upload(
+                Bucket=location.bucket_name, Key=key, UploadId=upload_id
+            )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error uploading file: {str(e)}",
+        )
+    finally:
+        source.seek(0)
+    return digest.hexdigest()
+
+
+def _delete_from_s3(location, key: str) -> None:
+    # Best effort: it cleans up after an error that is being reported anyway
+    try:
+        get_client(location).delete_object(Bucket=location.bucket_name, Key=key)
+    except (BotoCoreError, ClientError):
+        logger.exception("Could not delete %s from object storage", key)
+
+
+def _file_checksum(file_path: str | Path) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(settings.upload_chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _download_from_s3(location, key: str, local_file_path: str):
+    try:
+        s3 = get_client(location)
+        # Objects over one part are fetched as concurrent ranged GETs
+        config = TransferConfig(
+            multipart_threshold=settings.download_part_size,
+            multipart_chunksize=settings.download_part_size,
+            max_concurrency=settings.download_range_concurrency,
+        )
+        s3.download_file(location.bucket_name, key, local_file_path, Config=config)
+    except NoCredentialsError:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Missing credentials for downloading the file",
+        )
+
+
+def object_key(file: File) -> str:
+    """Key of a file in object storage and in the local object cache."""
+    return f"{file.unique_name}.{file.extension}"
+
+
+def fetch_all(fetchers: dict[K, Callable[[], V]]) -> dict[K, V]:
+    """
+    Run the fetchers of several files at once and return their results.
+
+    At most ``download_concurrency`` files are downloaded at the same time;
+    the first error is raised once the others have finished.
+    """
+    if len(fetchers) <= 1:
+        return {key: fetch() for key, fetch in fetchers.items()}
+    workers = min(len(fetchers), settings.download_concurrency)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {key: pool.submit(fetch) for key, fetch in fetchers.items()}
+    return {key: future.result() for key, future in futures.items()}
+
+
 class FileService:
     def __init__(self, db: Session):
         self.db = db
@@ -60,37 +195,115 @@ class FileService:
         location = SavedLocationCrud.get_active(self.db)
 
         unique_name = str(uuid.uuid4())
+        file_path = self._images_folder() / f"{unique_name}.{extension}"
 
-        folder_path = Path(settings.local_save_files) / "images"
-        folder_thumbnail = folder_path / "thumbnails"
+        try:
+            checksum = _stream_to_disk_and_s3(
+                location, file.file, file_path, f"{unique_name}.{extension}"
+            )
+            stats = self._process_upload(
+                location, f"{unique_name}.{extension}", file_path, unique_name
+            )
+            # Fresh uploads are usually the next operation's inputs
+            object_cache.put(f"{unique_name}.{extension}", file_path)
+        finally:
+            file_path.unlink(missing_ok=True)
 
-        file_path = folder_path / f"{unique_name}.{extension}"
+        return self._create_file_model(
+            filename, unique_name, extension, checksum, stats, project, location
+        )
 
-        folder_path.mkdir(parents=True, exist_ok=True)
-        folder_thumbnail.mkdir(parents=True, exist_ok=True)
+    def create_from_upload_session(self, upload_session: UploadSession) -> File:
+        """
+        Register the object assembled by a completed upload session as a file.
 
-        _save_file(file_path, file.file)
+        The object is downloaded once to build the previews and checksum,
+        the same way ``create`` does while an upload streams through.
+        """
+        unique_name = str(upload_session.unique_name)
+        extension = upload_session.extension
+        key = f"{unique_name}.{extension}"
 
-        image_path = folder_path / f"{unique_name}.png"
-        convertor.convert_to_png(file_path, image_path, (1080, 1080))
-        thumbnail_file_path = folder_thumbnail / f"{unique_name}.png"
-        convertor.convert_to_png(file_path, thumbnail_file_path)
+        with object_cache.pinned([key]):
+            file_path = object_cache.fetch(
+                key,
+                lambda path: _download_from_s3(upload_session.location, key, path),
+            )
+            checksum = _file_checksum(file_path)
+            stats = self._process_upload(
+                upload_session.location, key, file_path, unique_name
+            )
 
+        return self._create_file_model(
+            upload_session.filename,
+            upload_session.unique_name,
+            extension,
+            checksum,
+            stats,
+            upload_session.project,
+            upload_session.location,
+        )
+
+    @staticmethod
+    def _images_folder() -> Path:
+        folder_path = Path(settings.local_save_files) / "images"
+        (folder_path / "thumbnails").mkdir(parents=True, exist_ok=True)
+        return folder_path
+
+    def _process_upload(
+        self, location, key: str, file_path: str | Path, unique_name: str
+    ) -> dict:
+        """
+        ``_process_image`` for a file already in object storage.
+
+        A file that cannot be processed is deleted from the storage and the
+        local caches again, so no object is left behind without a File row.
+        """
         try:
-            _upload_to_s3(location, file.file, unique_name, extension)
-        finally:
-            file_path.unlink(missing_ok=True)
+            return self._process_image(file_path, unique_name)
+        except Exception as e:
+            _delete_from_s3(location, key)
+            object_cache.discard(key)
+            pyramid_cache.discard(str(unique_name))
+            if isinstance(e, HTTPException):
+                raise
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Could not read the image: {str(e)}",
+            )
 
+    def _process_image(self, file_path: str | Path, unique_name: str) -> dict:
+        """Compute the statistics, pyramid and previews of an upload."""
+        # Decode the upload once for its statistics and overview pyramid; the
+        # previews, tiles and preview-mode operations all read from the pyramid
+        folder_path = self._images_folder()
+        image = pyramid.read_image(file_path)
+        stats = raster_stats(image, read_nodata(str(file_path)))
+        pyramid_directory = Path(
+            pyramid_cache.fetch(
+                str(unique_name),
+                lambda path: pyramid.build_pyramid(image, Path(path)),
+            )
+        )
+        image_path = folder_path / f"{unique_name}.png"
+        pyramid.save_preview(pyramid_directory, image_path, 1080, image)
+        thumbnail_file_path = folder_path / "thumbnails" / f"{unique_name}.png"
+        pyramid.save_preview(pyramid_directory, thumbnail_file_path, 200, image)
+        return stats
+
+    def _create_file_model(
+        self, filename, unique_name, extension, checksum, stats, project, location
+    ) -> File:
         file_model = File(
             filename=filename,
             unique_name=unique_name,
             extension=extension,
+            checksum=checksum,
+            stats=stats,
             project=project,
             location=location,
         )
-        file_model = FileCrud.create(self.db, file_model)
-
-        return file_model
+        return FileCrud.create(self.db, file_model)
 
     def create_operation_output(
         self,
@@ -99,11 +312,18 @@ class FileService:
         extension: str,
         project: Project,
         title=str,
+        cache_key: str | None = None,
+        raster_path: Path | None = None,
     ) -> OperationOutput:
         location = SavedLocationCrud.get_active(self.db)
 
         with open(file_path, "r+b") as f:
             _upload_to_s3(location, f, unique_name, extension)
+        if raster_path is not None:
+            with open(raster_path, "rb") as f:
+                _upload_to_s3(location, f, unique_name, "npy")
+            # Tiles of the output are usually requested right away
+            object_cache.put(f"{unique_name}.npy", raster_path)
 
         # if file := OperationCrud.get_by_project(self.db, project):
         #     file.unique_name = unique_name
@@ -117,40 +337,88 @@ class FileService:
             extension=extension,
             project=project,
             location=location,
+            cache_key=cache_key,
+            has_raster=raster_path is not None,
         )
         output_model = OperationCrud.create(self.db, output_model)
         return output_model
 
     def get(self, _id: int, project: Project) -> str:
+        return self.get_fetcher(_id, project)()
+
+    def get_stats(self, _id: int, project: Project) -> dict:
+        file = FileCrud.get(self.db, _id, project)
+        if not file:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="File not found"
+            )
+        if file.stats is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="File was uploaded before statistics were computed",
+            )
+        return file.stats
+
+    def get_fetcher(self, _id: int, project: Project) -> Callable[[], str]:
+        """
+        Look a file up and return a callable that makes it local.
+
+        Only the lookup uses the database session, so the callables of
+        several files can run on threads (see ``fetch_all``).
+        """
         file = FileCrud.get(self.db, _id, project)
         if not file:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="File not found"
             )
 
-        full_filename = f"{file.unique_name}.{file.extension}"
+        key = object_key(file)
         location = file.location
-        local_file_path = os.path.join(settings.local_save_files, full_filename)
 
-        if not os.path.exists(local_file_path):
+        def fetch() -> str:
+            return object_cache.fetch(
+                key, lambda path: _download_from_s3(location, key, path)
+            )
+
+        return fetch
+
+    def get_operation_output(self, _id: int, project: Project) -> str:
+        output = OperationCrud.get_in_project(self.db, _id, project)
+        if not output:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Operation output not found",
+            )
+
+        full_filename = f"{output.unique_name}.{output.extension}"
+        folder_path = Path(settings.local_save_files) / "images"
+        local_file_path = str(folder_path / full_filename)
 
-            try:
-                s3 = boto3.client(
-                    "s3",
-                    endpoint_url=location.endpoint,
-                    aws_access_key_id=location.access_key,
-                    aws_secret_access_key=location.secret_key,
-                )
-                s3.download_file(
-                    file.location.bucket_name, full_filename, local_file_path
-                )
-            except NoCredentialsError:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Missing credentials for downloading the file",
-                )
+        if not os.path.exists(local_file_path):
+            folder_path.mkdir(parents=True, exist_ok=True)
+            _download_from_s3(output.location, full_filename, local_file_path)
         return local_file_path
 
+    def get_operation_output_raster(self, _id: int, project: Project) -> str:
+        """Local path of the raw result of an operation output, for tiling."""
+        output = OperationCrud.get_in_project(self.db, _id, project)
+        if not output:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Operation output not found",
+            )
+        if output.extension != "png":
+            return self.get_operation_output(_id, project)
+        if not output.has_raster:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Operation output has no raster result to tile",
+            )
+        key = f"{output.unique_name}.npy"
+        return object_cache.fetch(
+            key, lambda path: _download_from_s3(output.location, key, path)
+        )
+
     def soft_delete(self, _id: int):
         file = FileCrud.get_by_id(self.db, _id)
         if not file:
@@ -158,4 +426,5 @@ class FileService:
                 status_code=status.HTTP_404_NOT_FOUND, detail="File not found"
             )
         file = FileCrud.soft_delete(self.db, _id=_id)
+        pyramid_cache.discard(str(file.unique_name))
         return file
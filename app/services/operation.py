@@ -1,15 +1,20 @@
+import os
 import uuid
 from datetime import datetime
 from pathlib import Path
+from typing import Callable
 
+import numpy as np
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.config import settings
+from app.crud.file import FileCrud
 from app.crud.operation import OperationCrud
-from app.models import Project
+from app.models import OperationOutput, Project
 from app.openrs.base import Base as OpenrsBase
-from app.openrs.file_handler import OpenFiles
+from app.openrs.export import RASTER_EXTENSIONS, save_raster
+from app.openrs.file_handler import OpenFiles, roi_window
 from app.openrs.filters.gaussian import GAUSSIANCalculator
 from app.openrs.filters.laplacian import LAPLACIANCalculator
 from app.openrs.filters.mean import MEANCalculator
@@ -43,8 +48,20 @@ from app.openrs.spectral_indices.ndwi import NDWICalculator
 from app.openrs.spectral_indices.savi import SAVICalculator
 from app.openrs.spectral_indices.ui import UICalculator
 from app.openrs.spectral_profile.spectral_profile import SpectralProfile
-from app.schemas import Bands
-from app.services.file import FileService
+from app.openrs.tiling import Window, tile_budget
+from app.schemas import Bands, OutputFormat, RegionOfInterest
+from app.services import compute
+from app.services.file import FileService, fetch_all, object_key
+from app.services.result_cache import (
+    operation_cache_key,
+    operation_flights,
+    result_cache,
+)
+from app.services.tile import ensure_pyramid
+from app.utils import pyramid
+from app.utils.caching_files.array_cache import array_cache
+from app.utils.caching_files.object_cache import object_cache
+from app.utils.caching_files.pyramid_cache import pyramid_cache
 
 allowed_operation_types = {
     # SI
@@ -90,20 +107,119 @@ allowed_operation_types = {
 }
 
 
+# Calculators run in the compute workers, each with its own budget, so the
+# cap is split evenly between them
+tile_budget.resize(
+    max(
+        1,
+        (settings.openrs_max_tile_threads or os.cpu_count() or 1)
+        // compute.worker_count(),
+    )
+)
+
+
+def _resolve_roi(files_dict: dict, roi: dict, band_stats: dict) -> Window:
+    """Pixel window of a region of interest, checked against the first band."""
+    role, reference = next((role, path) for role, path in files_dict.items() if path)
+    window, bbox = roi.get("window"), roi.get("bbox")
+    try:
+        return roi_window(
+            reference,
+            window=Window(**window) if window else None,
+            bbox=(
+                (bbox["min_x"], bbox["min_y"], bbox["max_x"], bbox["max_y"])
+                if bbox
+                else None
+            ),
+            georeference=band_stats.get(role, {}).get("georeference"),
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED, detail=str(e)
+        )
+
+
+def _save_result(
+    raster: np.ndarray, path: Path, output_format: str, tile_output_path: Path | None
+) -> None:
+    if (
+        output_format == OutputFormat.npy.value
+        and isinstance(raster, np.memmap)
+        and tile_output_path is not None
+        and Path(raster.filename) == tile_output_path.resolve()
+    ):
+        # The tiles were already written to an .npy scratch file
+        raster.flush()
+        os.replace(tile_output_path, path)
+    else:
+        save_raster(raster, path, output_format)
+
+
+def _calculate_and_export(
+    operation_type: str,
+    files_dict: dict,
+    extra_params: dict | None,
+    save_path: Path,
+    title: str,
+    tile_output_path: Path | None,
+    output_format: str = OutputFormat.png.value,
+    roi: dict | None = None,
+    band_stats: dict | None = None,
+    raster_path: Path | None = None,
+) -> bool:
+    """
+    Run a calculator and write its export; executed in the compute pool.
+
+    PNG renders carry a title and legends, so the raw result is also written
+    to ``raster_path`` as .npy for tiling. Returns whether the operation has
+    a raw result.
+    """
+    openrs_base_class = allowed_operation_types[operation_type]
+    band_stats = band_stats or {}
+    try:
+        window = _resolve_roi(files_dict, roi, band_stats) if roi else None
+        openrs_instance: OpenrsBase = openrs_base_class(
+            OpenFiles(
+                **files_dict,
+                memmap=settings.openrs_memmap,
+                window=window,
+                stats=band_stats,
+            )
+        )
+        openrs_instance.tile_size = settings.openrs_tile_size
+        openrs_instance.tile_workers = settings.openrs_tile_workers or os.cpu_count()
+        openrs_instance.tile_output_path = tile_output_path
+
+        result = openrs_instance.calculate(extra_params)
+        raster = openrs_instance.raster(result)
+        if output_format == OutputFormat.png.value:
+            openrs_instance.export(save_path, title=title)
+            if raster is not None and raster_path is not None:
+                _save_result(
+                    raster, raster_path, OutputFormat.npy.value, tile_output_path
+                )
+        else:
+            if raster is None:
+                raise HTTPException(
+                    status_code=status.HTTP_412_PRECONDITION_FAILED,
+                    detail=f"Operation {operation_type} has no raster result, "
+                    f"use the {OutputFormat.png.value} output format",
+                )
+            _save_result(raster, save_path, output_format, tile_output_path)
+        return raster is not None
+    except HTTPException as e:
+        raise compute.RemoteHTTPException(e.status_code, e.detail)
+    finally:
+        if tile_output_path is not None:
+            tile_output_path.unlink(missing_ok=True)
+
+
 class Operation:
     def __init__(self, db: Session):
         self.db = db
 
-    def operate(
-        self,
-        bands: Bands,
-        tif_file: int | None,
-        operation_type: str,
-        title: str,
-        project: Project,
-        extra_params: dict | None,
-    ):
-
+    @staticmethod
+    def validate(bands: Bands, operation_type: str, project: Project) -> None:
         if operation_type not in allowed_operation_types:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -117,57 +233,236 @@ class Operation:
                 detail=f"Files with id's {res} not found",
             )
 
-        file_service = FileService(self.db)
+    def operate(
+        self,
+        bands: Bands,
+        tif_file: int | None,
+        operation_type: str,
+        title: str,
+        project: Project,
+        extra_params: dict | None,
+        output_format: OutputFormat = OutputFormat.png,
+        preview_size: int | None = None,
+        roi: RegionOfInterest | None = None,
+    ):
+        """
+        Run an operation and return its stored output.
 
-        files_dict = {
-            "red_path": (
-                file_service.get(bands.red_band, project) if bands.red_band else None
-            ),
-            "blue_path": (
-                file_service.get(bands.blue_band, project) if bands.blue_band else None
-            ),
-            "green_path": (
-                file_service.get(bands.green_band, project)
-                if bands.green_band
-                else None
-            ),
-            "nir_path": (
-                file_service.get(bands.nir_band, project) if bands.nir_band else None
-            ),
-            "swir1_path": (
-                file_service.get(bands.swir1_band, project)
-                if bands.swir1_band
-                else None
-            ),
-            "swir2_path": (
-                file_service.get(bands.swir2_band, project)
-                if bands.swir2_band
-                else None
-            ),
-            "tif_file": (file_service.get(tif_file, project) if tif_file else None),
+        With ``preview_size`` the calculator runs on the smallest overview
+        level of each input whose longer side is at least that many pixels,
+        instead of the full resolution bands. With a ``roi`` only that region
+        of the bands is read and computed; it already bounds the work, so it
+        is always read at full resolution.
+        """
+        if roi is not None:
+            preview_size = None
+
+        self.validate(bands, operation_type, project)
+
+        file_ids = {
+            "red_path": bands.red_band,
+            "blue_path": bands.blue_band,
+            "green_path": bands.green_band,
+            "nir_path": bands.nir_band,
+            "swir1_path": bands.swir1_band,
+            "swir2_path": bands.swir2_band,
+            "tif_file": tif_file,
         }
 
-        openrs_base_class = allowed_operation_types[operation_type]
-        openrs_instance: OpenrsBase = openrs_base_class(OpenFiles(**files_dict))
-        openrs_instance.calculate(extra_params)
+        request = dict(
+            file_ids=file_ids,
+            operation_type=operation_type,
+            title=title,
+            project=project,
+            extra_params=extra_params,
+            output_format=output_format,
+            preview_size=preview_size,
+            roi=roi,
+        )
+
+        if settings.operation_cache_enabled:
+            cache_key = self.cache_key(**request)
+            if cached_output := result_cache.get(self.db, cache_key, project):
+                return cached_output
+
+            # Identical requests arriving while this one computes wait for
+            # it; they get the output id and load it in their own session.
+            output_id = operation_flights.do(
+                cache_key,
+                lambda: self._compute_output(**request, cache_key=cache_key).id,
+            )
+            return OperationCrud.get(self.db, output_id)
+
+        return self._compute_output(**request)
+
+    def _compute_output(
+        self,
+        file_ids: dict[str, int | None],
+        operation_type: str,
+        title: str,
+        project: Project,
+        extra_params: dict | None,
+        output_format: OutputFormat = OutputFormat.png,
+        preview_size: int | None = None,
+        roi: RegionOfInterest | None = None,
+        cache_key: str | None = None,
+    ) -> OperationOutput:
+        file_service = FileService(self.db)
+
+        # Inputs are looked up one by one on the session, then downloaded
+        # concurrently; a file used for several bands is fetched once
+        fetchers = {}
+        for _id in file_ids.values():
+            if _id and _id not in fetchers:
+                fetchers[_id] = self._input_fetcher(
+                    file_service, _id, project, preview_size
+                )
+        input_files = [FileCrud.get(self.db, _id, project) for _id in fetchers]
+        input_stats = {file.id: file.stats for file in input_files}
+        object_keys = [object_key(file) for file in input_files]
+        array_keys = [f"{file.unique_name}.npy" for file in input_files]
+        pyramid_keys = [str(file.unique_name) for file in input_files]
+
+        # Calculators that can work from the stored band statistics alone get
+        # the paths the files would have, and nothing is downloaded
+        calculator = allowed_operation_types[operation_type]
+        if (
+            roi is None
+            and all(stats and stats.get("count") for stats in input_stats.values())
+            and not calculator.reads_pixels(extra_params)
+        ):
+            preview_size = None
+            fetchers = {
+                file.id: lambda key=key: (str(object_cache.path(key)), None)
+                for file, key in zip(input_files, object_keys)
+            }
 
         export_unique_filename = uuid.uuid4()
 
+        tile_output_path = None
+        if settings.openrs_tile_spill_to_disk:
+            tile_output_path = (
+                Path(settings.local_save_files)
+                / f"scratch/{export_unique_filename}.npy"
+            )
+
+        extension = RASTER_EXTENSIONS.get(output_format.value, "png")
         save_path = (
-            Path(settings.local_save_files) / f"images/{export_unique_filename}.png"
+            Path(settings.local_save_files)
+            / f"images/{export_unique_filename}.{extension}"
         )
-        openrs_instance.export(save_path, title=title)
+        raster_path = save_path.with_suffix(".npy") if extension == "png" else None
+        # Inputs stay in the local object cache until the calculator is done
+        with object_cache.pinned(object_keys), array_cache.pinned(
+            array_keys
+        ), pyramid_cache.pinned(pyramid_keys):
+            inputs = fetch_all(fetchers)
+            files_dict = {
+                role: inputs[_id][0] if _id else None for role, _id in file_ids.items()
+            }
+            # Also given to previews, which then normalize like the full run
+            band_stats = {
+                role: self._band_stats(input_stats[_id], inputs[_id][1])
+                for role, _id in file_ids.items()
+                if _id
+            }
+            has_raster = compute.run(
+                _calculate_and_export,
+                operation_type,
+                files_dict,
+                extra_params,
+                save_path,
+                title,
+                tile_output_path,
+                output_format.value,
+                roi.model_dump() if roi else None,
+                band_stats,
+                raster_path,
+            )
 
         file_model = file_service.create_operation_output(
             file_path=save_path,
-            extension="png",
+            extension=extension,
             unique_name=export_unique_filename,
             title=title,
             project=project,
+            cache_key=cache_key,
+            raster_path=raster_path if has_raster and extension == "png" else None,
         )
+        if cache_key is not None:
+            result_cache.put(cache_key, file_model)
 
         return file_model
 
+    def cache_key(
+        self,
+        file_ids: dict[str, int | None],
+        operation_type: str,
+        title: str,
+        project: Project,
+        extra_params: dict | None,
+        output_format: OutputFormat = OutputFormat.png,
+        preview_size: int | None = None,
+        roi: RegionOfInterest | None = None,
+    ) -> str:
+        input_files = {}
+        for role, _id in file_ids.items():
+            if not _id:
+                continue
+            file = FileCrud.get(self.db, _id, project)
+            if not file:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND, detail="File not found"
+                )
+            input_files[role] = file
+        return operation_cache_key(
+            input_files,
+            operation_type,
+            extra_params,
+            title,
+            output_format.value,
+            preview_size,
+            roi.model_dump() if roi else None,
+        )
+
+    def _input_fetcher(
+        self,
+        file_service: FileService,
+        _id: int,
+        project: Project,
+        preview_size: int | None,
+    ) -> Callable[[], tuple[str, dict | None]]:
+        """
+        Return a callable giving the local path of an input and its stats.
+
+        Full resolution inputs come from the decoded-array cache when it is
+        enabled, preview inputs from the overview pyramid.
+        """
+        fetch = file_service.get_fetcher(_id, project)
+        unique_name = str(FileCrud.get(self.db, _id, project).unique_name)
+
+        def fetch_full() -> tuple[str, dict | None]:
+            if settings.array_cache_max_size:
+                return array_cache.decode(unique_name, fetch)
+            return fetch(), None
+
+        if preview_size is None:
+            return fetch_full
+
+        def fetch_level() -> tuple[str, dict | None]:
+            directory, _ = ensure_pyramid(unique_name, fetch)
+            # The highest level is the source itself
+            path = pyramid.level_path(directory, preview_size)
+            return (str(path), None) if path else fetch_full()
+
+        return fetch_level
+
+    @staticmethod
+    def _band_stats(file_stats: dict | None, decoded_stats: dict | None) -> dict:
+        # Statistics stored at upload are complete; the decoded-array cache
+        # adds the georeference and covers files uploaded before them
+        return {**(decoded_stats or {}), **(file_stats or {})}
+
     def delete_operation_output(self, _id: int):
         operation_output = OperationCrud.get(db=self.db, _id=_id)
 
@@ -180,5 +475,8 @@ class Operation:
         operation_output.deleted_at = datetime.now()
 
         operation_output = OperationCrud.update(db=self.db, file=operation_output)
+        pyramid_cache.discard(str(operation_output.unique_name))
+        if operation_output.has_raster:
+            object_cache.discard(f"{operation_output.unique_name}.npy")
 
         return operation_output
@@ -0,0 +1,109 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.crud.operation_job import OperationJobCrud
+from app.databese import SessionLocal
+from app.models import OperationJob, OperationJobStatus, Project
+from app.schemas import Bands, OutputFormat, RegionOfInterest
+from app.services.operation import Operation
+from app.services.project import ProjectService
+
+_executor: ThreadPoolExecutor | None = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    # Jobs only orchestrate I/O here; the calculator itself runs in the
+    # compute process pool
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.operation_job_workers)
+    return _executor
+
+
+def run_operation_job(job_id: int) -> None:
+    """Run a submitted operation in the background and record its outcome."""
+    db = SessionLocal()
+    try:
+        job = OperationJobCrud.get(db, job_id)
+        job.status = OperationJobStatus.running
+        job = OperationJobCrud.update(db, job)
+
+        try:
+            user = job.project.user
+            project_service = ProjectService(db)
+            project = project_service.get(job.project_id, user)
+            roi = job.parameters.get("roi")
+            operation_output = Operation(db).operate(
+                bands=Bands(**job.parameters["bands"]),
+                tif_file=job.parameters["tif_file"],
+                operation_type=job.operation_type,
+                title=job.title,
+                project=project,
+                extra_params=job.parameters["extra_params"],
+                output_format=OutputFormat(
+                    job.parameters.get("output_format", OutputFormat.png.value)
+                ),
+                roi=RegionOfInterest(**roi) if roi else None,
+            )
+            project_service.change_updated_at_time(
+                _id=project.id, user=user, last_action=job.operation_type
+            )
+        except Exception as e:
+            db.rollback()
+            job = OperationJobCrud.get(db, job_id)
+            job.status = OperationJobStatus.failed
+            job.error = str(e.detail) if isinstance(e, HTTPException) else str(e)
+        else:
+            job = OperationJobCrud.get(db, job_id)
+            job.status = OperationJobStatus.succeeded
+            job.operation_output_id = operation_output.id
+        OperationJobCrud.update(db, job)
+    finally:
+        db.close()
+
+
+class OperationJobService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def submit(
+        self,
+        bands: Bands,
+        tif_file: int | None,
+        operation_type: str,
+        title: str,
+        project: Project,
+        extra_params: dict | None,
+        output_format: OutputFormat = OutputFormat.png,
+        roi: RegionOfInterest | None = None,
+    ) -> OperationJob:
+        Operation.validate(bands, operation_type, project)
+
+        job = OperationJob(
+            operation_type=operation_type,
+            title=title,
+            parameters={
+                "bands": bands.model_dump(exclude_unset=True),
+                "tif_file": tif_file,
+                "extra_params": extra_params,
+                "output_format": output_format.value,
+                "roi": roi.model_dump() if roi else None,
+            },
+            project=project,
+        )
+        job = OperationJobCrud.create(self.db, job)
+
+        _get_executor().submit(run_operation_job, job.id)
+        return job
+
+    def get(self, _id: int, project: Project) -> OperationJob:
+        job = OperationJobCrud.get_by_project(self.db, _id, project)
+        if job is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Operation job does not exist with {_id} id",
+            )
+        return job
@@ -0,0 +1,177 @@
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from typing import Callable, TypeVar
+
+from sqlalchemy.orm import Session
+
+from app import openrs
+from app.config import settings
+from app.crud.operation import OperationCrud
+from app.models import File, OperationOutput, Project
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def operation_cache_key(
+    input_files: dict[str, File],
+    operation_type: str,
+    extra_params: dict | None,
+    title: str,
+    output_format: str = "png",
+    preview_size: int | None = None,
+    roi: dict | None = None,
+) -> str:
+    """
+    Deterministic key of an operation request.
+
+    Inputs are identified by their role and ``unique_name`` (uploaded files
+    are immutable), parameters are canonicalized as sorted JSON, and the
+    openrs version is included so results from older code are not reused.
+    The title is part of the key because it is rendered into the image.
+    """
+    payload = {
+        "inputs": {role: str(file.unique_name) for role, file in input_files.items()},
+        "operation_type": operation_type,
+        "extra_params": extra_params or {},
+        "title": title,
+        "output_format": output_format,
+        "preview_size": preview_size,
+        "roi": roi,
+        "version": openrs.__version__,
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class OperationResultCache:
+    """
+    Lookup of finished operation outputs by cache key.
+
+    The database (``OperationOutput.cache_key``) is the source of truth, so
+    results are shared by every worker. An in-process LRU index of
+    ``max_entries`` keys in front of it skips the key query for hot results.
+    Outputs older than ``ttl`` or soft-deleted by the user are never
+    returned, which evicts them from the cache without touching the outputs.
+    """
+
+    def __init__(self, max_entries: int, ttl: timedelta):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._index: OrderedDict[str, int] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, key: str, project: Project) -> OperationOutput | None:
+        with self._lock:
+            output_id = self._index.get(key)
+            if output_id is not None:
+                self._index.move_to_end(key)
+
+        output = None
+        if output_id is not None:
+            output = OperationCrud.get(db, output_id)
+            if not self._is_fresh(output, project):
+                output = None
+                self._discard(key)
+        if output is None:
+            output = OperationCrud.get_by_cache_key(
+                db, key, project, created_after=datetime.now() - self.ttl
+            )
+
+        with self._lock:
+            if output is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if output is not None:
+            self.put(key, output)
+        return output
+
+    def put(self, key: str, output: OperationOutput) -> None:
+        with self._lock:
+            self._index[key] = output.id
+            self._index.move_to_end(key)
+            while len(self._index) > self.max_entries:
+                self._index.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._index),
+            }
+
+    def _discard(self, key: str) -> None:
+        with self._lock:
+            if self._index.pop(key, None) is not None:
+                self.evictions += 1
+
+    def _is_fresh(self, output: OperationOutput | None, project: Project) -> bool:
+        return (
+            output is not None
+            and output.deleted_at is None
+            and output.project_id == project.id
+            and output.created_at >= datetime.now() - self.ttl
+        )
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight block on its result (or exception) instead of running it
+    again. Once the call finishes the key is released, and later requests
+    are served by the result cache.
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._flights: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, func: Callable[[], T]) -> T:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = Future()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            logger.info("Waiting on in-flight operation %s", key)
+            return flight.result()
+
+        try:
+            result = func()
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._flights[key]
+
+
+result_cache = OperationResultCache(
+    max_entries=settings.operation_cache_max_entries,
+    ttl=timedelta(seconds=settings.operation_cache_ttl),
+)
+operation_flights = SingleFlight()
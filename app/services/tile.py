@@ -0,0 +1,98 @@
+from pathlib import Path
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.crud.file import FileCrud
+from app.crud.operation import OperationCrud
+from app.models import Project
+from app.services.file import FileService
+from app.utils import pyramid
+from app.utils.caching_files.array_cache import array_cache
+from app.utils.caching_files.pyramid_cache import pyramid_cache
+
+
+def ensure_pyramid(unique_name: str, get_source) -> tuple[Path, int]:
+    """
+    Return the pyramid directory and highest zoom level of a source.
+
+    Uploads build their pyramid up front; for anything else (operation
+    outputs, evicted pyramids, another node's local storage) it is built here
+    from ``get_source()``, a callable returning the local path of the source.
+    Concurrent first requests build it once.
+    """
+    directory = Path(
+        pyramid_cache.fetch(
+            unique_name,
+            lambda path: pyramid.build_pyramid(
+                pyramid.read_image(get_source()), Path(path)
+            ),
+        )
+    )
+    return directory, pyramid.pyramid_levels(directory)
+
+
+class TileService:
+    """
+    Serve 256 x 256 XYZ tiles of uploaded files and operation outputs.
+
+    Tiles are cut on demand from the memory-mapped overview levels of the
+    source, which is cheap enough that they are not stored; sources are
+    immutable, so clients and proxies cache them through HTTP instead.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_file_tile(
+        self, _id: int, project: Project, z: int, x: int, y: int
+    ) -> bytes:
+        file = FileCrud.get(self.db, _id, project)
+        if not file:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="File not found"
+            )
+        return self._get_tile(
+            str(file.unique_name),
+            lambda: FileService(self.db).get(_id, project),
+            z,
+            x,
+            y,
+        )
+
+    def get_operation_output_tile(
+        self, _id: int, project: Project, z: int, x: int, y: int
+    ) -> bytes:
+        output = OperationCrud.get_in_project(self.db, _id, project)
+        if not output:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Operation output not found",
+            )
+        return self._get_tile(
+            str(output.unique_name),
+            lambda: FileService(self.db).get_operation_output_raster(_id, project),
+            z,
+            x,
+            y,
+        )
+
+    def _get_tile(self, unique_name: str, get_source, z: int, x: int, y: int) -> bytes:
+        directory, top = ensure_pyramid(unique_name, get_source)
+
+        def source_path() -> str:
+            # The highest level is the source, decoded once by the array cache
+            if settings.array_cache_max_size:
+                return array_cache.decode(unique_name, get_source)[0]
+            return get_source()
+
+        tile = pyramid.read_tile(
+            directory, z, x, y, lambda: pyramid.read_image(source_path())
+        )
+        if tile is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Tile {z}/{x}/{y} is out of range (max zoom {top})",
+            )
+        return pyramid.encode_tile(tile)
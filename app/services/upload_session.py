@@ -0,0 +1,263 @@
+import math
+import uuid
+from typing import BinaryIO
+
+from botocore.exceptions import BotoCoreError, ClientError
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.crud.saved_location import SavedLocationCrud
+from app.crud.upload_session import UploadSessionCrud
+from app.models import (
+    File,
+    Project,
+    UploadSession,
+    UploadSessionStatus,
+    User,
+    UserRole,
+)
+from app.services.file import FileService, _delete_from_s3
+from app.utils.s3 import get_client
+
+# S3 multipart uploads take at most this many parts
+MAX_PARTS = 10000
+
+
+def max_session_size(user: User) -> int:
+    """Largest file a user may upload through an upload session."""
+    if user.role == UserRole.premium:
+        return settings.max_size_upload_session_premium
+    return settings.max_size_upload_session
+
+
+def part_count(upload_session: UploadSession) -> int:
+    return max(math.ceil(upload_session.size / upload_session.part_size), 1)
+
+
+def expected_part_size(upload_session: UploadSession, part_number: int) -> int:
+    """Every part has ``part_size`` bytes except the last, which has the rest."""
+    if part_number < part_count(upload_session):
+        return upload_session.part_size
+    return upload_session.size - (part_number - 1) * upload_session.part_size
+
+
+def wrong_part_size(part_number: int, expected_size: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Part {part_number} should have {expected_size} bytes",
+    )
+
+
+def _storage_error(e: Exception) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail=f"Error uploading file: {str(e)}",
+    )
+
+
+class UploadSessionService:
+    """
+    Resumable uploads of large files, mapped onto S3 multipart uploads.
+
+    A session is opened with the file size and gets a fixed part size; the
+    client then PUTs the parts, in any order and in parallel, straight to
+    the multipart upload on the active ``SavedLocation``. A part that failed
+    is simply sent again, and ``list_parts`` tells a client that lost track
+    which parts the storage already has. Completing the session assembles
+    the object and registers it as a file like a regular upload.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create(
+        self, filename: str, extension: str, size: int, project: Project
+    ) -> UploadSession:
+        max_size = max_session_size(project.user)
+        if size > max_size:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Size of this file more than {max_size}",
+            )
+
+        location = SavedLocationCrud.get_active(self.db)
+        unique_name = uuid.uuid4()
+        part_size = max(settings.upload_session_part_size, math.ceil(size / MAX_PARTS))
+        try:
+            upload_id = get_client(location).create_multipart_upload(
+                Bucket=location.bucket_name, Key=f"{unique_name}.{extension}"
+            )["UploadId"]
+        except (BotoCoreError, ClientError) as e:
+            raise _storage_error(e)
+
+        upload_session = UploadSession(
+            filename=filename,
+            unique_name=unique_name,
+            extension=extension,
+            size=size,
+            part_size=part_size,
+            upload_id=upload_id,
+            project=project,
+            location=location,
+        )
+        return UploadSessionCrud.create(self.db, upload_session)
+
+    def get(self, _id: int, project: Project) -> UploadSession:
+        upload_session = UploadSessionCrud.get_by_project(self.db, _id, project)
+        if not upload_session:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Upload session not found",
+            )
+        return upload_session
+
+    def get_open(self, _id: int, project: Project) -> UploadSession:
+        upload_session = self.get(_id, project)
+        if upload_session.status != UploadSessionStatus.open:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Upload session is {upload_session.status.value}",
+            )
+        return upload_session
+
+    def get_part_size(self, _id: int, project: Project, part_number: int) -> int:
+        """Size in bytes part ``part_number`` of an open session must have."""
+        return self._part_size(self.get_open(_id, project), part_number)
+
+    @staticmethod
+    def _part_size(upload_session: UploadSession, part_number: int) -> int:
+        if part_number > part_count(upload_session):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Upload session has {part_count(upload_session)} parts",
+            )
+        return expected_part_size(upload_session, part_number)
+
+    def upload_part(
+        self,
+        _id: int,
+        project: Project,
+        part_number: int,
+        body: BinaryIO,
+        content_length: int,
+    ) -> dict:
+        upload_session = self.get_open(_id, project)
+        expected_size = self._part_size(upload_session, part_number)
+        if content_length != expected_size:
+            raise wrong_part_size(part_number, expected_size)
+
+        location = upload_session.location
+        try:
+            response = get_client(location).upload_part(
+                Bucket=location.bucket_name,
+                Key=self._key(upload_session),
+                UploadId=upload_session.upload_id,
+                PartNumber=part_number,
+                Body=body,
+                ContentLength=content_length,
+            )
+        except (BotoCoreError, ClientError) as e:
+            raise _storage_error(e)
+        return {
+            "part_number": part_number,
+            "size": content_length,
+            "etag": response["ETag"],
+        }
+
+    def list_parts(self, upload_session: UploadSession) -> list[dict]:
+        """Parts the storage has received, ordered by part number."""
+        if upload_session.status != UploadSessionStatus.open:
+            return []
+
+        location = upload_session.location
+        s3 = get_client(location)
+        parts = []
+        marker = 0
+        try:
+            while True:
+                response = s3.list_parts(
+                    Bucket=location.bucket_name,
+                    Key=self._key(upload_session),
+                    UploadId=upload_session.upload_id,
+                    PartNumberMarker=marker,
+                )
+                parts.extend(
+                    {
+                        "part_number": part["PartNumber"],
+                        "size": part["Size"],
+                        "etag": part["ETag"],
+                    }
+                    for part in response.get("Parts", [])
+                )
+                if not response.get("IsTruncated"):
+                    break
+                marker = response["NextPartNumberMarker"]
+        except (BotoCoreError, ClientError) as e:
+            raise _storage_error(e)
+        return parts
+
+    def complete(self, _id: int, project: Project) -> File:
+        upload_session = self.get_open(_id, project)
+        parts = self.list_parts(upload_session)
+
+        received = {
+            part["part_number"]
+            for part in parts
+            if part["size"] == expected_part_size(upload_session, part["part_number"])
+        }
+        missing = sorted(set(range(1, part_count(upload_session) + 1)) - received)
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Missing parts: {missing[:20]}",
+            )
+
+        location = upload_session.location
+        try:
+            get_client(location).complete_multipart_upload(
+                Bucket=location.bucket_name,
+                Key=self._key(upload_session),
+                UploadId=upload_session.upload_id,
+                MultipartUpload={
+                    "Parts": [
+                        {"PartNumber": part["part_number"], "ETag": part["etag"]}
+                        for part in parts
+                    ]
+                },
+            )
+        except (BotoCoreError, ClientError) as e:
+            raise _storage_error(e)
+
+        try:
+            file = FileService(self.db).create_from_upload_session(upload_session)
+        except Exception:
+            # The multipart upload is gone, so the session cannot be retried
+            self.db.rollback()
+            _delete_from_s3(location, self._key(upload_session))
+            upload_session.status = UploadSessionStatus.failed
+            UploadSessionCrud.update(self.db, upload_session)
+            raise
+        upload_session.status = UploadSessionStatus.completed
+        upload_session.file = file
+        UploadSessionCrud.update(self.db, upload_session)
+        return file
+
+    def abort(self, _id: int, project: Project) -> UploadSession:
+        upload_session = self.get_open(_id, project)
+        location = upload_session.location
+        try:
+            get_client(location).abort_multipart_upload(
+                Bucket=location.bucket_name,
+                Key=self._key(upload_session),
+                UploadId=upload_session.upload_id,
+            )
+        except (BotoCoreError, ClientError) as e:
+            raise _storage_error(e)
+
+        upload_session.status = UploadSessionStatus.aborted
+        return UploadSessionCrud.update(self.db, upload_session)
+
+    @staticmethod
+    def _key(upload_session: UploadSession) -> str:
+        return f"{upload_session.unique_name}.{upload_session.extension}"
@@ -0,0 +1,90 @@
+import json
+import os
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+from app.config import settings
+from app.openrs.file_handler import (
+    _memmap_raster,
+    _min_max,
+    _read_raster,
+    read_georeference,
+)
+
+from .object_cache import ObjectCache
+
+
+class ArrayCache(ObjectCache):
+    """
+    Decoded bands stored as ``{unique_name}.npy``, evicted LRU.
+
+    Compressed TIFFs have to be decoded (and scanned for their min/max) by
+    every operation that reads them; their decoded arrays are kept here so
+    later operations memory-map them instead, sharing pages across
+    processes. Next to each array, ``stats/{unique_name}.json`` holds its
+    range and georeference, so normalization and bounding box regions
+    need neither a scan nor the original file.
+
+    TIFFs that can already be memory-mapped are used as they are. This tier
+    has its own size bound, independent of the object cache holding the
+    compressed files.
+    """
+
+    def stats_path(self, name: str) -> Path:
+        return self.directory / "stats" / f"{Path(name).stem}.json"
+
+    def decode(
+        self, unique_name: str, fetch_source: Callable[[], str]
+    ) -> tuple[str, dict | None]:
+        """
+        Return the path of a decoded band and its statistics.
+
+        ``fetch_source`` returns the local path of the original file; it is
+        only called when the band is not decoded yet.
+        """
+        name = f"{unique_name}.npy"
+        source_path = None
+        if not self.path(name).exists():
+            source_path = fetch_source()
+            if _memmap_raster(source_path) is not None:
+                return source_path, None
+
+        path = self.fetch(
+            name, lambda path: self._write(name, source_path or fetch_source(), path)
+        )
+        try:
+            stats = json.loads(self.stats_path(name).read_text())
+        except FileNotFoundError:
+            stats = None
+        return path, stats
+
+    def _write(self, name: str, source_path: str, path: str) -> None:
+        raster = _read_raster(source_path)
+        minimum, maximum = _min_max(raster)
+        stats = {
+            "raw_min": minimum.item(),
+            "raw_max": maximum.item(),
+            "georeference": read_georeference(source_path),
+        }
+
+        stats_path = self.stats_path(name)
+        stats_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_stats_path = stats_path.with_name(f".{stats_path.name}.{os.getpid()}")
+        temp_stats_path.write_text(json.dumps(stats))
+        os.replace(temp_stats_path, stats_path)
+        # The array is renamed into place by fetch, after its stats exist
+        with open(path, "wb") as f:
+            np.save(f, raster)
+
+    def _remove(self, name: str) -> list[Path]:
+        removed = super()._remove(name)
+        stats_path = self._hide(self.stats_path(name))
+        return removed + ([stats_path] if stats_path else [])
+
+
+array_cache = ArrayCache(
+    Path(settings.local_save_files) / "arrays",
+    settings.array_cache_max_size * 1024**3,
+)
@@ -0,0 +1,198 @@
+import os
+import threading
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterable
+
+from app.config import settings
+
+
+class ObjectCache:
+    """
+    Size-bounded local copies of object storage files, evicted LRU.
+
+    Every object is one file named after its object key. Downloads go to a
+    hidden temporary file in the same directory that is renamed into place
+    when complete, so readers in any process only ever see whole files.
+
+    The index of objects and their sizes lives in memory; it is built from a
+    single directory listing on first use, ordered by last access. Once the
+    total size goes over ``max_size`` the least recently used objects are
+    deleted, except pinned ones: an operation pins its inputs for as long as
+    it reads them. The index and pins are per process, so with several
+    processes on one directory the bound is approximate and a file deleted
+    by another process is simply downloaded again.
+    """
+
+    def __init__(self, directory: Path, max_size: int):
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, int] | None = None
+        self._size = 0
+        self._pins: Counter[str] = Counter()
+        self._downloads: dict[str, threading.Lock] = {}
+
+    def _index(self) -> OrderedDict[str, int]:
+        # Called with the lock held
+        if self._entries is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            entries = []
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.startswith(".") or not self._is_entry(entry):
+                        continue
+                    stat = entry.stat()
+                    entries.append(
+                        (
+                            max(stat.st_atime, stat.st_mtime),
+                            entry.name,
+                            self._entry_size(Path(entry.path)),
+                        )
+                    )
+            self._entries = OrderedDict(
+                (name, size) for _, name, size in sorted(entries)
+            )
+            self._size = sum(self._entries.values())
+        return self._entries
+
+    def path(self, name: str) -> Path:
+        return self.directory / name
+
+    def fetch(self, name: str, download: Callable[[str], None]) -> str:
+        """
+        Return the local path of object ``name``, downloading it if missing.
+
+        ``download(path)`` writes the object to ``path``. Concurrent fetches
+        of the same object in a process download it once.
+        """
+        path = self.path(name)
+        with self._lock:
+            entries = self._index()
+            if name in entries and path.exists():
+                entries.move_to_end(name)
+                return str(path)
+            download_lock = self._downloads.setdefault(name, threading.Lock())
+
+        with download_lock:
+            if not path.exists():
+                temp_path = self.directory / (
+                    f".{name}.{os.getpid()}.{threading.get_ident()}.part"
+                )
+                try:
+                    download(str(temp_path))
+                    os.replace(temp_path, path)
+                finally:
+                    self._delete(temp_path)
+            self._add(name, self._entry_size(path))
+        with self._lock:
+            self._downloads.pop(name, None)
+        return str(path)
+
+    def put(self, name: str, file_path: Path) -> str:
+        """Move a local file into the cache, e.g. an upload that was just stored."""
+        path = self.path(name)
+        with self._lock:
+            self._index()
+        os.replace(file_path, path)
+        self._add(name, self._entry_size(path))
+        return str(path)
+
+    def _add(self, name: str, size: int) -> None:
+        with self._lock:
+            entries = self._index()
+            self._size += size - entries.get(name, 0)
+            entries[name] = size
+            entries.move_to_end(name)
+            removed = self._evict()
+        self._delete_all(removed)
+
+    def _evict(self) -> list[Path]:
+        # Called with the lock held; returns what to _delete_all once released
+        removed = []
+        for name in list(self._entries):
+            if self._size <= self.max_size:
+                break
+            if self._pins[name]:
+                continue
+            removed.extend(self._remove(name))
+            self._size -= self._entries.pop(name)
+        return removed
+
+    def discard(self, name: str) -> None:
+        """Delete an object, e.g. one derived from a file that was deleted."""
+        with self._lock:
+            entries = self._index()
+            self._size -= entries.pop(name, 0)
+            removed = self._remove(name)
+        self._delete_all(removed)
+
+    def _remove(self, name: str) -> list[Path]:
+        """
+        Move an object out of the way under a hidden name and return it.
+
+        Renaming is cheap enough to do under the lock, and a fetch of the
+        same name right after sees it missing; the data itself is deleted
+        once the lock is released.
+        """
+        return [path for path in [self._hide(self.path(name))] if path is not None]
+
+    def _hide(self, path: Path) -> Path | None:
+        hidden_path = path.with_name(
+            f".{path.name}.{os.getpid()}.{threading.get_ident()}.deleted"
+        )
+        try:
+            os.replace(path, hidden_path)
+        except FileNotFoundError:
+            return None
+        return hidden_path
+
+    def _delete_all(self, paths: list[Path]) -> None:
+        for path in paths:
+            self._delete(path)
+
+    @staticmethod
+    def _is_entry(entry: os.DirEntry) -> bool:
+        return entry.is_file()
+
+    @staticmethod
+    def _entry_size(path: Path) -> int:
+        return path.stat().st_size
+
+    @staticmethod
+    def _delete(path: Path) -> None:
+        path.unlink(missing_ok=True)
+
+    @contextmanager
+    def pinned(self, names: Iterable[str]):
+        """Keep the given objects from being evicted inside the block."""
+        names = list(names)
+        with self._lock:
+            self._pins.update(names)
+        try:
+            yield
+        finally:
+            removed = []
+            with self._lock:
+                self._pins.subtract(names)
+                self._pins = +self._pins
+                if self._entries is not None:
+                    removed = self._evict()
+            self._delete_all(removed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._index()
+            return {
+                "objects": len(entries),
+                "size": self._size,
+                "max_size": self.max_size,
+                "pinned": len(self._pins),
+            }
+
+
+object_cache = ObjectCache(
+    Path(settings.local_save_files) / "objects",
+    settings.object_cache_max_size * 1024**3,
+)
@@ -0,0 +1,36 @@
+import os
+import shutil
+from pathlib import Path
+
+from app.config import settings
+
+from .object_cache import ObjectCache
+
+
+class PyramidCache(ObjectCache):
+    """
+    Overview pyramids, one directory per file or operation output, evicted
+    LRU as a whole.
+
+    A pyramid is built into a hidden directory and renamed into place like
+    any other object, so readers only see complete pyramids; one evicted or
+    deleted by another process is simply built again.
+    """
+
+    @staticmethod
+    def _is_entry(entry: os.DirEntry) -> bool:
+        return entry.is_dir()
+
+    @staticmethod
+    def _entry_size(path: Path) -> int:
+        return sum(item.stat().st_size for item in path.iterdir() if item.is_file())
+
+    @staticmethod
+    def _delete(path: Path) -> None:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+pyramid_cache = PyramidCache(
+    Path(settings.local_save_files) / "pyramids",
+    settings.pyramid_cache_max_size * 1024**3,
+)
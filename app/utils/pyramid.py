@@ -0,0 +1,180 @@
+import io
+import json
+import math
+from pathlib import Path
+from typing import Callable
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from app.openrs.export import quantize, to_rgb
+from app.openrs.file_handler import _read_raster
+
+TILE_SIZE = 256
+
+# dtypes cv2.resize can average directly
+_RESIZE_DTYPES = (np.uint8, np.uint16, np.int16, np.float32, np.float64)
+
+
+def max_zoom(height: int, width: int, tile_size: int = TILE_SIZE) -> int:
+    """Zoom level at which the image is shown at full resolution."""
+    return max(math.ceil(math.log2(max(height, width) / tile_size)), 0)
+
+
+def read_image(path: str | Path) -> np.ndarray:
+    """Decode an image, raster or .npy result in its native dtype."""
+    path = str(path)
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode="r")
+    return _read_raster(path, memmap=True)
+
+
+def value_range(image: np.ndarray) -> tuple[float, float]:
+    """Finite min and max of an image, used to stretch it for display."""
+    if image.dtype == np.uint8:
+        return 0.0, 255.0
+    values = image[np.isfinite(image)] if image.dtype.kind == "f" else image
+    if not values.size:
+        return 0.0, 1.0
+    return float(values.min()), float(values.max())
+
+
+def to_display(
+    array: np.ndarray, vmin: float | None = None, vmax: float | None = None
+) -> np.ndarray:
+    """
+    Convert an array to uint8 gray (H x W) or RGB (H x W x 3).
+
+    8-bit images are kept as they are and float RGB in [0, 1] is scaled like
+    imshow does; anything else is stretched linearly between vmin and vmax
+    (the array's own range by default), the way calculator exports are.
+    """
+    if array.ndim == 3:
+        array = array[:, :, :3] if array.shape[2] >= 3 else array[:, :, 0]
+    if array.dtype == np.uint8:
+        return np.ascontiguousarray(array)
+    if array.ndim == 3 and array.dtype.kind == "f":
+        if (vmax if vmax is not None else np.nanmax(array)) <= 1.0:
+            return to_rgb(array)
+    return quantize(array, vmin, vmax)[0]
+
+
+def _downsample(level: np.ndarray) -> np.ndarray:
+    height, width = level.shape[:2]
+    if level.dtype not in _RESIZE_DTYPES:
+        level = level.astype(np.float32)
+    return cv2.resize(
+        np.ascontiguousarray(level),
+        (math.ceil(width / 2), math.ceil(height / 2)),
+        interpolation=cv2.INTER_AREA,
+    )
+
+
+def build_pyramid(image: np.ndarray, directory: Path) -> int:
+    """
+    Write the overview levels of an image as ``level_{z}.npy`` files.
+
+    The highest level is the image itself, so it is not written: readers
+    take it from the source. Every level below halves the previous one by
+    area averaging, so the whole pyramid costs one decode and each level is
+    computed from a small input. Levels keep the values of the source, so
+    they can stand in for it as low resolution operation inputs; the source
+    value range and the highest level are stored in ``pyramid.json`` so
+    every level and tile is stretched the same way for display.
+
+    ``directory`` is expected to be new, see ``PyramidCache``. Returns the
+    highest zoom level.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    top = max_zoom(image.shape[0], image.shape[1])
+    vmin, vmax = value_range(image)
+
+    level = image
+    for z in range(top - 1, -1, -1):
+        level = _downsample(level)
+        np.save(directory / f"level_{z}.npy", level)
+    (directory / "pyramid.json").write_text(
+        json.dumps({"top": top, "vmin": vmin, "vmax": vmax})
+    )
+    return top
+
+
+def _metadata(directory: Path) -> dict:
+    return json.loads((directory / "pyramid.json").read_text())
+
+
+def pyramid_levels(directory: Path) -> int:
+    """Highest zoom level of a built pyramid."""
+    return _metadata(directory)["top"]
+
+
+def _display_range(directory: Path) -> tuple[float, float]:
+    metadata = _metadata(directory)
+    return metadata["vmin"], metadata["vmax"]
+
+
+def read_level(directory: Path, z: int) -> np.ndarray:
+    return np.load(directory / f"level_{z}.npy", mmap_mode="r")
+
+
+def level_path(directory: Path, min_size: int) -> Path | None:
+    """
+    Path of the smallest level whose longer side is at least ``min_size``,
+    or None when only the source itself is large enough.
+    """
+    for z in range(pyramid_levels(directory)):
+        if max(read_level(directory, z).shape[:2]) >= min_size:
+            return directory / f"level_{z}.npy"
+    return None
+
+
+def save_preview(
+    directory: Path, file_path: Path, size: int, source: np.ndarray
+) -> None:
+    """Write a PNG of the image fitted in ``size`` x ``size`` from its pyramid."""
+    path = level_path(directory, size)
+    level = np.load(path) if path else source
+    image = Image.fromarray(to_display(level, *_display_range(directory)))
+    image.thumbnail((size, size))
+    image.save(file_path, format="PNG")
+
+
+def read_tile(
+    directory: Path, z: int, x: int, y: int, read_source: Callable[[], np.ndarray]
+) -> np.ndarray | None:
+    """
+    Cut tile (x, y) of zoom level ``z`` out of a built pyramid.
+
+    Tiles of the highest level are cut from ``read_source()``. Tiles are
+    always TILE_SIZE square; the area outside the image is transparent.
+    Returns None for tiles outside the image.
+    """
+    top = pyramid_levels(directory)
+    if not 0 <= z <= top:
+        return None
+    level = read_source() if z == top else read_level(directory, z)
+    height, width = level.shape[:2]
+
+    row, col = y * TILE_SIZE, x * TILE_SIZE
+    if x < 0 or y < 0 or row >= height or col >= width:
+        return None
+    window = to_display(
+        level[row : row + TILE_SIZE, col : col + TILE_SIZE],
+        *_display_range(directory),
+    )
+
+    channels = 1 if window.ndim == 2 else window.shape[2]
+    tile = np.zeros((TILE_SIZE, TILE_SIZE, channels + 1), dtype=np.uint8)
+    tile[: window.shape[0], : window.shape[1], :channels] = window.reshape(
+        window.shape[0], window.shape[1], channels
+    )
+    tile[: window.shape[0], : window.shape[1], channels] = 255
+    return tile
+
+
+def encode_tile(tile: np.ndarray) -> bytes:
+    mode = "LA" if tile.shape[2] == 2 else "RGBA"
+    buffer = io.BytesIO()
+    Image.fromarray(tile, mode=mode).save(buffer, format="PNG", compress_level=1)
+    return buffer.getvalue()
@@ -0,0 +1,70 @@
+import os
+import threading
+
+import boto3
+from botocore.client import BaseClient
+from botocore.config import Config
+
+from app.config import settings
+
+_lock = threading.Lock()
+_clients: dict[tuple, BaseClient] = {}
+_pid = os.getpid()
+
+
+def _client_key(location) -> tuple:
+    return (
+        location.id,
+        location.endpoint,
+        location.access_key,
+        location.secret_key,
+        location.bucket_name,
+    )
+
+
+def get_client(location) -> BaseClient:
+    """
+    Return the process-wide S3 client of a ``SavedLocation``.
+
+    Building a client resolves credentials and endpoint metadata, and a new
+    client starts without open connections, so every call used to pay for
+    that plus TLS handshakes. Clients are thread-safe and are kept per
+    location, each with a connection pool sized for parallel part and band
+    transfers and TCP keep-alive so idle connections survive between
+    operations. The key includes the endpoint and credentials, so a changed
+    location gets a fresh client; ``invalidate`` drops the old one.
+    """
+    global _pid
+    key = _client_key(location)
+    with _lock:
+        if _pid != os.getpid():
+            # Connection pools must not be shared with a forked parent
+            _clients.clear()
+            _pid = os.getpid()
+        client = _clients.get(key)
+        if client is None:
+            for stale_key in [k for k in _clients if k[0] == location.id]:
+                del _clients[stale_key]
+            # boto3's default session is not thread-safe, so each client
+            # gets its own
+            client = boto3.session.Session().client(
+                "s3",
+                endpoint_url=location.endpoint,
+                aws_access_key_id=location.access_key,
+                aws_secret_access_key=location.secret_key,
+                config=Config(
+                    max_pool_connections=settings.s3_max_pool_connections,
+                    tcp_keepalive=True,
+                    retries={"max_attempts": 5, "mode": "standard"},
+                ),
+            )
+            _clients[key] = client
+        return client
+
+
+def invalidate(location_id: int | None = None) -> None:
+    """Drop the cached client of a location, or every client."""
+    with _lock:
+        for key in list(_clients):
+            if location_id is None or key[0] == location_id:
+                del _clients[key]
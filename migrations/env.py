@@ -22,8 +22,7 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 from app.models import Base
 from app.auth.models import Base as AuthBase
-from app.utils.caching_files.models import Base as FileCacheBase
-target_metadata = [Base.metadata, AuthBase.metadata, FileCacheBase.metadata]
+target_metadata = [Base.metadata, AuthBase.metadata]
 
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
@@ -0,0 +1,19 @@
+import os
+import tempfile
+
+# app reads its settings on import; tests run without a .env or services
+for name, value in {
+    "POSTGRES_SERVER": "localhost",
+    "POSTGRES_USER": "test",
+    "POSTGRES_PASSWORD": "test",
+    "POSTGRES_DB": "test",
+    "ENV_MODE": "test",
+    "SECRET_KEY": "test",
+    "OBJECT_STORAGE_ENDPOINT": "https://example.com",
+    "OBJECT_STORAGE_ACCESS_KEY": "test",
+    "OBJECT_STORAGE_SECRET_KEY": "test",
+    "OBJECT_STORAGE_BUCKET_NAME": "test",
+    "OBJECT_STORAGE_URL": "https://example.com",
+    "LOCAL_SAVE_FILES": tempfile.mkdtemp(prefix="local-files-"),
+}.items():
+    os.environ.setdefault(name, value)
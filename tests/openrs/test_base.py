@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+import tifffile
+
+from app.openrs.file_handler import OpenFiles
+from app.openrs.filters.gaussian import GAUSSIANCalculator
+from app.openrs.filters.median import MEDIANCalculator
+from app.openrs.hsv.hsv import HSVCalculator
+from app.openrs.spectral_indices.ndvi import NDVICalculator
+
+
+@pytest.fixture
+def band_paths(tmp_path):
+    rng = np.random.default_rng(0)
+    paths = {}
+    for name in ("red", "green", "blue", "nir"):
+        path = tmp_path / f"{name}.tif"
+        tifffile.imwrite(path, rng.integers(1, 4000, (300, 257)).astype(np.uint16))
+        paths[f"{name}_path"] = str(path)
+    paths["tif_file"] = paths["red_path"]
+    return paths
+
+
+CALCULATORS = [
+    (NDVICalculator, ["red_path", "nir_path"], {}),
+    (HSVCalculator, ["nir_path", "green_path", "blue_path"], {}),
+    (GAUSSIANCalculator, ["tif_file"], {}),
+    (MEDIANCalculator, ["tif_file"], {"kernel_size": 5}),
+]
+
+
+def _calculate(calculator_class, files, tile_size, extra_params=None, **options):
+    calculator = calculator_class(files)
+    calculator.tile_size = tile_size
+    for name, value in options.items():
+        setattr(calculator, name, value)
+    return calculator.calculate(extra_params or {})
+
+
+@pytest.mark.parametrize("calculator_class, bands, extra_params", CALCULATORS)
+@pytest.mark.parametrize("tile_workers", [1, 4])
+def test_tiled_matches_whole_scene(
+    band_paths, calculator_class, bands, extra_params, tile_workers
+):
+    def files():
+        return OpenFiles(**{band: band_paths[band] for band in bands})
+
+    whole = _calculate(calculator_class, files(), 4096, extra_params)
+    # Tiles that do not divide the scene exercise the ragged edges too
+    tiled = _calculate(
+        calculator_class, files(), 64, extra_params, tile_workers=tile_workers
+    )
+
+    assert tiled.shape == whole.shape
+    np.testing.assert_allclose(tiled, whole, equal_nan=True)
+
+
+def test_tiled_output_file(tmp_path, band_paths):
+    files = OpenFiles(red_path=band_paths["red_path"], nir_path=band_paths["nir_path"])
+    whole = _calculate(NDVICalculator, files, 4096)
+
+    output_path = tmp_path / "ndvi.npy"
+    tiled = _calculate(NDVICalculator, files, 64, tile_output_path=output_path)
+
+    assert isinstance(tiled, np.memmap)
+    np.testing.assert_allclose(np.load(output_path), whole, equal_nan=True)
@@ -0,0 +1,130 @@
+import numpy as np
+import pytest
+import tifffile
+
+from app.openrs.file_handler import OpenFiles, raster_stats
+from app.openrs.tiling import Window
+
+
+@pytest.fixture
+def band():
+    return np.random.default_rng(0).integers(1, 4000, (300, 257)).astype(np.uint16)
+
+
+@pytest.fixture
+def band_path(tmp_path, band):
+    path = tmp_path / "red.tif"
+    tifffile.imwrite(path, band)
+    return str(path)
+
+
+def test_raster_stats_without_nodata(band):
+    # A small block size makes both passes run over many row blocks
+    stats = raster_stats(band, block_size=4096)
+
+    assert stats["count"] == band.size
+    assert stats["nodata_count"] == 0
+    assert stats["min"] == stats["raw_min"] == band.min()
+    assert stats["max"] == stats["raw_max"] == band.max()
+    assert stats["mean"] == pytest.approx(band.mean())
+    assert stats["std"] == pytest.approx(band.std())
+    assert sum(stats["histogram"]) == sum(stats["histogram_256"]) == band.size
+    bin_width = np.diff(stats["histogram_range"])[0] / len(stats["histogram"])
+    for p, value in stats["percentiles"].items():
+        assert value == pytest.approx(np.percentile(band, float(p)), abs=bin_width)
+
+
+def test_raster_stats_with_nodata(band):
+    band = band.astype(np.float32)
+    band[:10] = 0
+    band[20, 20] = np.nan
+    valid = band[np.isfinite(band) & (band != 0)]
+
+    stats = raster_stats(band, nodata=0, block_size=4096)
+
+    assert stats["nodata"] == 0
+    assert stats["count"] == valid.size
+    assert stats["nodata_count"] == band.size - valid.size
+    assert stats["min"] == valid.min()
+    assert stats["max"] == valid.max()
+    assert stats["mean"] == pytest.approx(valid.mean())
+    assert stats["std"] == pytest.approx(valid.std(), rel=1e-6)
+    assert sum(stats["histogram"]) == valid.size
+    # The raw range is undefined once the band has NaNs
+    assert stats["raw_min"] is None and stats["raw_max"] is None
+
+
+def test_raster_stats_keeps_fill_in_raw_range(band):
+    band[:10] = 0
+
+    stats = raster_stats(band, nodata=0)
+
+    assert stats["min"] == band[10:].min()
+    assert stats["raw_min"] == 0
+    assert stats["raw_max"] == stats["max"] == band.max()
+
+
+def test_raster_stats_percentiles_of_constant_band():
+    stats = raster_stats(np.full((20, 30), 7, dtype=np.uint8))
+
+    assert set(stats["percentiles"].values()) == {7.0}
+
+
+def test_raster_stats_only_nodata():
+    stats = raster_stats(np.zeros((4, 4), dtype=np.uint8), nodata=0)
+
+    assert stats["count"] == 0
+    assert stats["nodata_count"] == 16
+    assert "min" not in stats
+
+
+def test_window_read(band, band_path):
+    window = Window(50, 30, 100, 120)
+    files = OpenFiles(red_path=band_path, window=window)
+
+    assert files.get_shape("red") == (100, 120)
+    inner = Window(10, 20, 30, 40)
+    np.testing.assert_array_equal(
+        files.read_window("red", inner), band[window.slices][inner.slices]
+    )
+
+
+@pytest.mark.parametrize("compression", [None, "zlib"])
+def test_memmap_read(tmp_path, band, compression):
+    path = tmp_path / "red.tif"
+    tifffile.imwrite(path, band, compression=compression)
+
+    files = OpenFiles(red_path=str(path), memmap=True)
+
+    # Compressed files cannot be mapped and are decoded instead
+    raster = files.get_collection()[0]
+    assert isinstance(raster, np.memmap) == (compression is None)
+    np.testing.assert_array_equal(raster, band)
+
+
+@pytest.mark.parametrize("memmap", [False, True])
+def test_window_normalizes_like_whole_band(band, band_path, memmap):
+    window = Window(50, 30, 100, 120)
+    stats = {"red_path": raster_stats(band)}
+    whole = OpenFiles(red_path=band_path).get_normalize_bands()["red"]
+
+    files = OpenFiles(red_path=band_path, memmap=memmap, window=window, stats=stats)
+
+    np.testing.assert_array_equal(
+        files.get_normalize_bands()["red"], whole[window.slices]
+    )
+    np.testing.assert_array_equal(
+        files.read_window("red", Window(0, 0, 100, 120), normalized=True),
+        whole[window.slices],
+    )
+
+
+def test_normalization_with_and_without_stats_agree(band, band_path):
+    band[:10] = 0
+    tifffile.imwrite(band_path, band)
+    stats = {"red_path": raster_stats(band, nodata=0)}
+
+    with_stats = OpenFiles(red_path=band_path, stats=stats).get_normalize_bands()
+    without_stats = OpenFiles(red_path=band_path).get_normalize_bands()
+
+    np.testing.assert_array_equal(with_stats["red"], without_stats["red"])